@@ -4,42 +4,129 @@ Flask web server for AWS Bedrock Support Bot UI
 Provides a web interface to interact with the Bedrock agent
 """
 
-from flask import Flask, render_template, request, jsonify, send_from_directory
-import boto3
+from flask import Flask, render_template, request, jsonify, g
+from werkzeug.middleware.proxy_fix import ProxyFix
 import json
 import uuid
 import time
 import os
-from botocore.exceptions import ClientError
+import random
+import re
+import gzip
+import hashlib
+import hmac
+import ipaddress
+import mimetypes
+import select
+import socket
+import threading
+from botocore.exceptions import ClientError, ConnectTimeoutError, ReadTimeoutError
+from urllib3.exceptions import ReadTimeoutError as StreamReadTimeoutError
+from intent_matcher import IntentMatcher
+from completion_reader import read_completion, TRUNCATION_NOTICE
+from scheduler import FairScheduler, RateLimited, QueueTimeout, QueueFull, LANES
+from jobs import JobStore, JobRunner, JobQueueFull
+import inventory
+
+try:
+    import brotli  # Optional: enables 'br' encoding when installed
+except ImportError:
+    brotli = None
 
 # Configuration
 REGION = "us-east-1"
 PROFILE = "bedrock-user"  # Your AWS profile
-PROJECT_NAME = "bedrock-support-bot"
+PROJECT_NAME = inventory.PROJECT_NAME
+INTENTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'intents.json')
+STATIC_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_ASSETS = ['index.html']  # UI assets held pre-compressed in memory
+STATIC_CACHE_CONTROL = 'public, max-age=300, must-revalidate'
+COMPRESS_MIN_SIZE = 1024  # Bytes; smaller JSON responses are sent uncompressed
+JSON_GZIP_LEVEL = 5  # Per-response compression, trades ratio for CPU
+DEFAULT_REQUEST_TIMEOUT = 60  # Seconds allowed per /chat request when the client sends no deadline
+MAX_REQUEST_TIMEOUT = 300
+MAX_RESPONSE_BYTES = 64 * 1024  # Longer agent answers are truncated
+MAX_CONCURRENT_INVOCATIONS = 8  # Upstream agent calls in flight at once
+RESERVED_INTERACTIVE_SLOTS = 2  # Slots batch/API traffic can never take
+CLIENT_RATE = 1.0  # Sustained requests per second per client
+CLIENT_BURST = 10
+CLIENT_WEIGHTS = {}  # Fair-share weight per client ID (default 1.0)
+API_KEYS_FILE = os.environ.get('API_KEYS_FILE')  # JSON {api_key: {"client": id, "lane": lane, "replay": bool}}
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', '0'))  # Reverse proxies whose X-Forwarded-For is trusted
+INTERACTIVE_NETWORKS = [  # Unkeyed clients served in the interactive lane (the chat UI)
+    ipaddress.ip_network(network.strip())
+    for network in os.environ.get('INTERACTIVE_NETWORKS', '127.0.0.0/8,::1/128').split(',')
+    if network.strip()
+]
+MAX_QUEUE_PER_LANE = 100
+JOB_WORKERS = 4  # Background workers for POST /jobs
+MAX_PENDING_JOBS = 50  # Queued + running jobs before POST /jobs answers 503
+MAX_STORED_JOBS = 1000
+JOB_RESULT_TTL = 600  # Seconds a finished job stays retrievable
+JOB_TIMEOUT = 300  # Seconds from submission a job may spend waiting for a worker, queued and invoking the agent
+WATCHDOG_INTERVAL = 0.25  # Seconds between deadline/disconnect checks during an invocation
+INVOKE_TIMEOUT_STEPS = [1, 2, 5, 15, 30, 60, 120, MAX_REQUEST_TIMEOUT]  # Seconds one invoke_agent attempt may take, one runtime client each
+INVOKE_ATTEMPTS = 5  # invoke_agent attempts for transient errors, while the deadline allows
+RETRY_BASE_DELAY = 0.5  # Seconds; exponential backoff with full jitter
+RETRY_MAX_DELAY = 8
+RETRYABLE_ERRORS = {'ThrottlingException', 'ServiceQuotaExceededException', 'InternalServerException',
+                    'BadGatewayException', 'ServiceUnavailableException'}
+TRAFFIC_LOG = os.environ.get('TRAFFIC_LOG')  # Append-only JSONL of /chat arrivals, e.g. traffic.jsonl (unset = off)
+TRAFFIC_LOG_MESSAGES = os.environ.get('TRAFFIC_LOG_MESSAGES', 'scrubbed')  # 'scrubbed' text, or 'hash' (length and hash only)
+# Key for the hashes in the traffic log; without it a random key is used, so hashes change on restart
+TRAFFIC_LOG_SECRET = (os.environ.get('TRAFFIC_LOG_SECRET') or os.urandom(32).hex()).encode('utf-8')
 
 app = Flask(__name__)
+if TRUSTED_PROXY_HOPS:
+    # remote_addr becomes the address the nearest trusted proxy saw, not the proxy's own
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS)
 
 # Global variables
 bedrock_agent_id = None
 bedrock_runtime = None
+deadline_runtime_clients = False  # Use per-deadline runtime clients (set once AWS is initialized)
+api_keys = None  # Loaded from API_KEYS_FILE on first use
+traffic_log_lock = threading.Lock()
+intent_matcher = IntentMatcher(INTENTS_FILE)
+static_assets = {}
+scheduler = FairScheduler(
+    MAX_CONCURRENT_INVOCATIONS,
+    reserved_slots=RESERVED_INTERACTIVE_SLOTS,
+    client_rate=CLIENT_RATE,
+    client_burst=CLIENT_BURST,
+    client_weights=CLIENT_WEIGHTS,
+    max_queue=MAX_QUEUE_PER_LANE
+)
+job_runner = JobRunner(JobStore(MAX_STORED_JOBS, JOB_RESULT_TTL), JOB_WORKERS, MAX_PENDING_JOBS)
+invocation_stats_lock = threading.Lock()
+invocation_stats = {
+    'completed': 0,
+    'completed_seconds': 0.0,
+    'cancelled_deadline': 0,
+    'cancelled_disconnect': 0,
+    'upstream_seconds_saved': 0.0
+}
+
+EMAIL_PATTERN = re.compile(r'[\w.+-]+@[\w-]+(\.[\w-]+)+')
+# Digit groups joined by separators (phone numbers, card and account numbers) or long digit runs
+NUMBER_PATTERN = re.compile(r'\d[\d\s().+-]{6,}\d|\d{4,}')
 
 def initialize_aws():
     """Initialize AWS clients and find the agent"""
-    global bedrock_agent_id, bedrock_runtime
+    global bedrock_agent_id, bedrock_runtime, deadline_runtime_clients
     
     try:
-        # Initialize AWS session
-        session = boto3.Session(profile_name=PROFILE, region_name=REGION)
-        bedrock_agent = session.client('bedrock-agent')
-        bedrock_runtime = session.client('bedrock-agent-runtime')
-        
-        # Find the agent
-        response = bedrock_agent.list_agents()
-        for agent in response.get('agentSummaries', []):
-            if PROJECT_NAME in agent['agentName']:
-                bedrock_agent_id = agent['agentId']
-                print(f"✅ Found Bedrock agent: {bedrock_agent_id}")
-                return True
+        # Find the agent (reuses a recent inventory when one is cached)
+        bedrock_agent_id = inventory.find_agent(REGION, PROFILE)
+        if bedrock_agent_id:
+            # One pooled client, sized for every invocation that can run at once
+            bedrock_runtime = inventory.client(
+                'bedrock-agent-runtime', REGION, PROFILE,
+                max_pool_connections=MAX_CONCURRENT_INVOCATIONS
+            )
+            deadline_runtime_clients = True
+            print(f"✅ Found Bedrock agent: {bedrock_agent_id}")
+            return True
         
         print("❌ No Bedrock agent found")
         return False
@@ -48,12 +135,157 @@ def initialize_aws():
         print(f"❌ Failed to initialize AWS: {e}")
         return False
 
-def call_bedrock_agent(message):
-    """Call the Bedrock agent with a message"""
+def runtime_client(deadline=None):
+    """Runtime client for one invoke_agent attempt that gives up by the deadline
+
+    The time left is rounded down to one of INVOKE_TIMEOUT_STEPS and split between
+    the connect and read timeouts, so a stalled connect followed by a stalled read
+    still fits. Once the stream starts, the watchdog enforces the exact deadline.
+    """
+    if deadline is None or not deadline_runtime_clients:
+        return bedrock_runtime
+    remaining = deadline - time.monotonic()
+    timeout = max([step for step in INVOKE_TIMEOUT_STEPS if step <= remaining], default=INVOKE_TIMEOUT_STEPS[0])
+    # A handful of pooled clients, one per step, rather than one per request
+    return inventory.client(
+        'bedrock-agent-runtime', REGION, PROFILE,
+        max_pool_connections=MAX_CONCURRENT_INVOCATIONS,
+        connect_timeout=timeout / 2,
+        read_timeout=timeout / 2,
+        retries={'total_max_attempts': 1}  # Retried by invoke_agent() against the deadline instead
+    )
+
+def invoke_agent(deadline, **kwargs):
+    """invoke_agent, retrying transient errors and timeouts with backoff while the deadline allows
+
+    Without a deadline the pooled client's own botocore retries apply.
+    """
+    if deadline is None:
+        return bedrock_runtime.invoke_agent(**kwargs)
+    attempt = 0
+    while True:
+        attempt += 1
+        if deadline - time.monotonic() < INVOKE_TIMEOUT_STEPS[0]:
+            raise InvocationCancelled('deadline')  # Too little time left for an attempt
+        try:
+            return runtime_client(deadline).invoke_agent(**kwargs)
+        except (ClientError, ConnectTimeoutError, ReadTimeoutError) as e:
+            if isinstance(e, ClientError) and e.response['Error']['Code'] not in RETRYABLE_ERRORS:
+                raise
+            delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1)))
+            if attempt >= INVOKE_ATTEMPTS or time.monotonic() + delay + INVOKE_TIMEOUT_STEPS[0] > deadline:
+                raise
+            time.sleep(delay)
+
+def stream_socket(stream):
+    """The socket under a botocore event stream, or None"""
+    raw = getattr(stream, '_raw_stream', None)
+    sock = getattr(getattr(raw, '_connection', None), 'sock', None)
+    if sock is None:
+        # Older urllib3 may have released the connection; go through the response's socket file
+        sock = getattr(getattr(getattr(getattr(raw, '_fp', None), 'fp', None), 'raw', None), '_sock', None)
+    return sock
+
+def shutdown_stream(stream):
+    """Shut down the socket under an event stream so a read blocked on it returns at once
+
+    close() waits behind the blocked read; shutdown() does not. Returns False when
+    the stream exposes no socket.
+    """
+    raw = getattr(stream, '_raw_stream', None)
+    if hasattr(raw, 'shutdown'):
+        raw.shutdown()  # urllib3 >= 2.3
+        return True
+    sock = stream_socket(stream)
+    if sock is None:
+        return False
+    sock.shutdown(socket.SHUT_RDWR)
+    return True
+
+class InvocationCancelled(Exception):
+    """Raised when an agent invocation is abandoned before completion"""
+
+    def __init__(self, reason):
+        super().__init__(f"Invocation cancelled: {reason}")
+        self.reason = reason
+
+class InvocationWatchdog:
+    """Aborts an agent event stream once the deadline passes or the client goes away"""
+
+    def __init__(self, stream, deadline=None, is_disconnected=None):
+        self.stream = stream
+        self.deadline = deadline
+        self.is_disconnected = is_disconnected
+        self.reason = None
+        self.finished = False
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self.watch, daemon=True)
+
+    def __enter__(self):
+        if self.deadline is not None or self.is_disconnected is not None:
+            self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.finish()
+        self.done.set()
+        if self.reason:
+            try:
+                self.stream.close()  # Nothing is blocked reading it any more
+            except Exception:
+                pass
+        return False
+
+    def finish(self):
+        """Mark reading as finished; returns the reason if a cancellation got in first"""
+        with self.lock:
+            self.finished = True
+            return self.reason
+
+    def watch(self):
+        while not self.done.wait(WATCHDOG_INTERVAL):
+            if self.deadline is not None and time.monotonic() >= self.deadline:
+                self.cancel('deadline')
+            elif self.is_disconnected is not None and self.is_disconnected():
+                self.cancel('disconnect')
+
+    def cancel(self, reason):
+        with self.lock:
+            if self.finished:
+                return  # The answer is already complete
+            self.reason = reason
+        self.done.set()
+        try:
+            if not shutdown_stream(self.stream):
+                self.stream.close()
+        except Exception:
+            pass
+
+def record_invocation(started, cancelled_reason=None):
+    """Track invocation durations and estimate upstream time saved by cancellation"""
+    elapsed = time.monotonic() - started
+    with invocation_stats_lock:
+        if cancelled_reason is None:
+            invocation_stats['completed'] += 1
+            invocation_stats['completed_seconds'] += elapsed
+            return
+        invocation_stats[f'cancelled_{cancelled_reason}'] += 1
+        if invocation_stats['completed']:
+            average = invocation_stats['completed_seconds'] / invocation_stats['completed']
+            invocation_stats['upstream_seconds_saved'] += max(0.0, average - elapsed)
+
+def call_bedrock_agent(message, deadline=None, is_disconnected=None, on_text=None):
+    """Call the Bedrock agent with a message, abandoning it at the deadline or on disconnect"""
+    started = time.monotonic()
     try:
+        if deadline is not None and started >= deadline:
+            raise InvocationCancelled('deadline')
+        
         session_id = f"web-{uuid.uuid4().hex[:8]}"
         
-        response = bedrock_runtime.invoke_agent(
+        response = invoke_agent(
+            deadline,
             agentId=bedrock_agent_id,
             agentAliasId='TSTALIASID',
             sessionId=session_id,
@@ -63,11 +295,29 @@ def call_bedrock_agent(message):
         # Extract completion from response
         completion = ""
         if 'completion' in response:
-            for event in response['completion']:
-                if 'chunk' in event:
-                    chunk = event['chunk']
-                    if 'bytes' in chunk:
-                        completion += chunk['bytes'].decode('utf-8')
+            sock = stream_socket(response['completion']) if deadline is not None else None
+            if sock is not None:
+                # The attempt's read timeout was rounded down; from here the watchdog enforces the deadline
+                sock.settimeout(max(0.0, deadline - time.monotonic()) + WATCHDOG_INTERVAL)
+            with InvocationWatchdog(response['completion'], deadline, is_disconnected) as watchdog:
+                try:
+                    reader = read_completion(
+                        response['completion'],
+                        max_bytes=MAX_RESPONSE_BYTES,
+                        on_text=on_text,
+                        should_stop=lambda: watchdog.reason is not None
+                    )
+                except Exception:
+                    if not watchdog.finish():
+                        raise
+                # Once reading has finished, a deadline passing before __exit__ no longer counts
+                cancelled = watchdog.finish()
+            if cancelled:
+                raise InvocationCancelled(cancelled)
+            completion = reader.text()
+            if reader.truncated:
+                completion = completion.rstrip() + TRUNCATION_NOTICE
+        record_invocation(started)
         
         # If no completion found, try to extract from raw response
         if not completion:
@@ -84,37 +334,307 @@ def call_bedrock_agent(message):
             return "I don't have permission to access the agent. Please check the configuration."
         else:
             return f"I encountered an error: {error_code}. Please try again."
+    except InvocationCancelled as e:
+        record_invocation(started, e.reason)
+        raise
+    except (ConnectTimeoutError, ReadTimeoutError, StreamReadTimeoutError) as e:
+        if deadline is None:
+            return f"I'm having technical difficulties: {str(e)}"
+        # The upstream stayed silent for as long as the deadline allowed
+        record_invocation(started, 'deadline')
+        raise InvocationCancelled('deadline') from e
     except Exception as e:
         return f"I'm having technical difficulties: {str(e)}"
 
+def request_deadline(data):
+    """Monotonic deadline from the X-Request-Timeout header or 'timeout' body field (seconds)"""
+    timeout = request.headers.get('X-Request-Timeout', data.get('timeout'))
+    try:
+        timeout = float(timeout) if timeout is not None else DEFAULT_REQUEST_TIMEOUT
+    except (TypeError, ValueError):
+        timeout = DEFAULT_REQUEST_TIMEOUT
+    return time.monotonic() + max(0.0, min(timeout, MAX_REQUEST_TIMEOUT))
+
+def load_api_keys():
+    """Read the configured API keys, skipping malformed entries"""
+    if not API_KEYS_FILE:
+        return {}
+    try:
+        with open(API_KEYS_FILE, encoding='utf-8') as f:
+            entries = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"❌ Failed to load API keys: {e}")
+        return {}
+    keys = {}
+    for key, entry in entries.items():
+        if not isinstance(entry, dict) or not entry.get('client') or entry.get('lane', 'batch') not in LANES:
+            print(f"❌ Skipping malformed API key entry: {entry!r}")
+            continue
+        keys[key] = entry
+    return keys
+
+def get_api_keys():
+    global api_keys
+    if api_keys is None:
+        api_keys = load_api_keys()
+    return api_keys
+
+def is_interactive_address(address):
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(address in network for network in INTERACTIVE_NETWORKS)
+
+def request_client():
+    """Client identity and priority lane for scheduling; (None, None) for an unknown API key
+
+    Identity comes from a configured API key, otherwise from the remote address
+    (as reported by TRUSTED_PROXY_HOPS reverse proxies). Request headers alone
+    never pick the identity or the lane.
+    """
+    api_key = request.headers.get('X-Api-Key')
+    if api_key:
+        entry = get_api_keys().get(api_key)
+        if entry is None:
+            return None, None
+        if entry.get('replay') and request.headers.get('X-Replay-Client'):
+            # Trace replay re-creates the recorded clients and lanes (see replay-traffic.py)
+            lane = request.headers.get('X-Replay-Lane')
+            return f"replay:{request.headers['X-Replay-Client']}", lane if lane in LANES else 'batch'
+        return entry['client'], entry.get('lane', 'batch')
+    
+    address = request.remote_addr or 'unknown'
+    return address, 'interactive' if is_interactive_address(address) else 'batch'
+
+def traffic_hash(value, length=16):
+    """HMAC for the traffic log; unlike a plain hash, enumerating addresses cannot reverse it without the key"""
+    return hmac.new(TRAFFIC_LOG_SECRET, value.encode('utf-8'), hashlib.sha256).hexdigest()[:length]
+
+def client_disconnect_probe():
+    """Return a check for whether the client closed its connection, if the server exposes the socket"""
+    sock = request.environ.get('werkzeug.socket')
+    if sock is None:
+        return None
+    
+    def is_disconnected():
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+            # A readable socket with nothing to peek at means the peer sent FIN
+            return bool(readable) and sock.recv(1, socket.MSG_PEEK) == b''
+        except ValueError:
+            return False  # TLS sockets do not support MSG_PEEK
+        except OSError:
+            return True
+    
+    return is_disconnected
+
+def load_static_assets():
+    """Read UI assets once and pre-compress every supported encoding"""
+    for filename in STATIC_ASSETS:
+        with open(os.path.join(STATIC_DIR, filename), 'rb') as f:
+            body = f.read()
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        # mtime=0 keeps the gzip bytes identical across processes sharing the strong ETag
+        encodings = {'identity': body, 'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli:
+            encodings['br'] = brotli.compress(body, quality=11)
+        static_assets[filename] = {
+            'mimetype': mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+            # Strong validators must differ per representation
+            'variants': {
+                encoding: (data, digest if encoding == 'identity' else f"{digest}-{encoding}")
+                for encoding, data in encodings.items()
+            }
+        }
+
+def negotiate_encoding(available):
+    """Pick the best content coding the client accepts, preferring br over gzip"""
+    for encoding in ('br', 'gzip'):
+        if encoding in available and request.accept_encodings[encoding]:
+            return encoding
+    return 'identity'
+
+def serve_static_asset(filename):
+    """Serve a pre-compressed asset from memory with ETag revalidation"""
+    if filename not in static_assets:
+        load_static_assets()  # Not started via __main__ (e.g. a WSGI server)
+    asset = static_assets[filename]
+    encoding = negotiate_encoding(asset['variants'])
+    body, etag = asset['variants'][encoding]
+    
+    if request.if_none_match.contains_weak(etag):  # If-None-Match uses weak comparison (RFC 9110)
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, mimetype=asset['mimetype'])
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+    
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = STATIC_CACHE_CONTROL
+    response.vary.add('Accept-Encoding')
+    return response
+
+def anonymize_message(message):
+    """Strip emails and number sequences (phones, account numbers) from a message
+
+    This is only a partial scrub: names and street addresses are kept. Set
+    TRAFFIC_LOG_MESSAGES=hash to record no message text at all.
+    """
+    message = EMAIL_PATTERN.sub('<email>', message)
+    return NUMBER_PATTERN.sub('<number>', message)
+
+def record_traffic(entry):
+    """Append one request arrival to the traffic log"""
+    line = json.dumps(entry, ensure_ascii=False) + '\n'
+    try:
+        with traffic_log_lock:
+            with open(TRAFFIC_LOG, 'a', encoding='utf-8') as f:
+                f.write(line)
+    except OSError as e:
+        print(f"❌ Failed to write traffic log: {e}")
+
+@app.after_request
+def log_chat_traffic(response):
+    """Record /chat arrivals for trace-driven replay (see replay-traffic.py)"""
+    if TRAFFIC_LOG and request.endpoint == 'chat':
+        data = request.get_json(silent=True)
+        message = data.get('message') if isinstance(data, dict) else None
+        message = message if isinstance(message, str) else ''
+        if response.status_code < 400:
+            outcome = 'ok'
+        elif response.status_code < 500:
+            outcome = 'rejected'
+        else:
+            outcome = 'error'
+        client_id, lane = g.get('client') or request_client()
+        entry = {
+            'timestamp': g.arrival_time,
+            'client': traffic_hash(client_id) if client_id else None,
+            'lane': lane,
+            'length': len(message),
+            'outcome': outcome,
+            'status': response.status_code,
+            'latency': round(time.time() - g.arrival_time, 4)
+        }
+        if TRAFFIC_LOG_MESSAGES == 'hash':
+            entry['message_hash'] = traffic_hash(message)
+        else:
+            entry['message'] = anonymize_message(message)
+        record_traffic(entry)
+    return response
+
+@app.after_request
+def compress_json_response(response):
+    """Compress large JSON responses for clients that accept it"""
+    if (response.mimetype != 'application/json' or response.is_streamed
+            or response.direct_passthrough or 'Content-Encoding' in response.headers):
+        return response
+    
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+    
+    encoding = negotiate_encoding(('br', 'gzip') if brotli else ('gzip',))
+    if encoding == 'br':
+        response.set_data(brotli.compress(data, quality=4))
+    elif encoding == 'gzip':
+        response.set_data(gzip.compress(data, compresslevel=JSON_GZIP_LEVEL))
+    else:
+        return response
+    
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
 @app.route('/')
 def index():
     """Serve the main chat interface"""
-    return send_from_directory('.', 'index.html')
+    return serve_static_asset('index.html')
+
+def parse_message(data):
+    """Validate a request body, returning (message, error)"""
+    if not data or 'message' not in data:
+        return None, 'No message provided'
+    
+    user_message = data['message'].strip()
+    
+    if not user_message:
+        return None, 'Empty message'
+    
+    if len(user_message) > 500:
+        return None, 'Message too long (max 500 characters)'
+    
+    return user_message, None
+
+def run_chat_job(job, message, client_id, lane):
+    """Background job body: wait for an upstream slot, then stream the answer into the job"""
+    fast_path = intent_matcher.match(message)
+    if fast_path:
+        return fast_path[1]
+    
+    deadline = job.submitted + JOB_TIMEOUT
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise RuntimeError('Timed out waiting for a worker')
+    try:
+        # The token was already charged when the job was submitted
+        with scheduler.slot(client_id, lane, timeout=remaining, rate_limit=False):
+            job.start()
+            return call_bedrock_agent(message, deadline=deadline, on_text=job.append_text)
+    except QueueTimeout:
+        raise RuntimeError('Timed out waiting for the agent')
+    except InvocationCancelled:
+        raise RuntimeError('Agent did not answer in time')
 
 @app.route('/chat', methods=['POST'])
 def chat():
     """Handle chat messages"""
+    g.arrival_time = time.time()
     try:
         data = request.get_json()
+        user_message, error = parse_message(data)
+        if error:
+            return jsonify({'error': error}), 400
         
-        if not data or 'message' not in data:
-            return jsonify({'error': 'No message provided'}), 400
-        
-        user_message = data['message'].strip()
-        
-        if not user_message:
-            return jsonify({'error': 'Empty message'}), 400
-        
-        if len(user_message) > 500:
-            return jsonify({'error': 'Message too long (max 500 characters)'}), 400
+        # Answer high-frequency intents without invoking the agent
+        fast_path = intent_matcher.match(user_message)
+        if fast_path:
+            intent, answer = fast_path
+            return jsonify({
+                'response': answer,
+                'intent': intent,
+                'timestamp': time.time()
+            })
         
         # Check if agent is available
         if not bedrock_agent_id:
             return jsonify({'error': 'Bedrock agent not available. Please check the server logs.'}), 503
         
-        # Call the Bedrock agent
-        response = call_bedrock_agent(user_message)
+        # Call the Bedrock agent once the scheduler grants an upstream slot
+        deadline = request_deadline(data)
+        client_id, lane = g.client = request_client()
+        if client_id is None:
+            return jsonify({'error': 'Invalid API key'}), 401
+        try:
+            with scheduler.slot(client_id, lane, timeout=deadline - time.monotonic()):
+                response = call_bedrock_agent(
+                    user_message,
+                    deadline=deadline,
+                    is_disconnected=client_disconnect_probe()
+                )
+        except RateLimited as e:
+            return jsonify({'error': 'Too many requests. Please slow down.'}), 429, {
+                'Retry-After': str(max(1, round(e.retry_after)))
+            }
+        except QueueFull:
+            return jsonify({'error': 'Server busy. Please try again later.'}), 503
+        except QueueTimeout:
+            return jsonify({'error': 'Request deadline exceeded'}), 504
+        except InvocationCancelled as e:
+            if e.reason == 'disconnect':
+                return jsonify({'error': 'Client disconnected'}), 499
+            return jsonify({'error': 'Request deadline exceeded'}), 504
         
         return jsonify({
             'response': response,
@@ -124,6 +644,55 @@ def chat():
     except Exception as e:
         return jsonify({'error': f'Server error: {str(e)}'}), 500
 
+def invocation_stats_snapshot():
+    """Copy of the invocation counters for reporting"""
+    with invocation_stats_lock:
+        snapshot = dict(invocation_stats)
+    snapshot['upstream_seconds_saved'] = round(snapshot['upstream_seconds_saved'], 3)
+    snapshot['completed_seconds'] = round(snapshot['completed_seconds'], 3)
+    return snapshot
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """Queue a question for background processing and return its job ID immediately"""
+    try:
+        data = request.get_json()
+        user_message, error = parse_message(data)
+        if error:
+            return jsonify({'error': error}), 400
+        
+        if not bedrock_agent_id:
+            return jsonify({'error': 'Bedrock agent not available. Please check the server logs.'}), 503
+        
+        client_id, lane = request_client()
+        if client_id is None:
+            return jsonify({'error': 'Invalid API key'}), 401
+        try:
+            scheduler.take_token(client_id, lane)
+            job = job_runner.submit(run_chat_job, user_message, client_id, lane)
+        except RateLimited as e:
+            return jsonify({'error': 'Too many requests. Please slow down.'}), 429, {
+                'Retry-After': str(max(1, round(e.retry_after)))
+            }
+        except JobQueueFull:
+            return jsonify({'error': 'Server busy. Please try again later.'}), 503
+        
+        status_url = f"/jobs/{job.id}"
+        return jsonify({'job_id': job.id, 'status': job.status, 'status_url': status_url}), 202, {
+            'Location': status_url
+        }
+        
+    except Exception as e:
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    """Return a job's status, partial text while running, and its final result"""
+    job = job_runner.store.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found or expired'}), 404
+    return jsonify(job.to_dict())
+
 @app.route('/status')
 def status():
     """Check server and agent status"""
@@ -131,9 +700,25 @@ def status():
         'server': 'running',
         'agent_available': bedrock_agent_id is not None,
         'agent_id': bedrock_agent_id,
+        'traffic_log': TRAFFIC_LOG,
+        'invocations': invocation_stats_snapshot(),
+        'scheduler': scheduler.stats(),
+        'jobs': job_runner.stats(),
         'timestamp': time.time()
     })
 
+@app.route('/intents')
+def intents():
+    """Report intent fast path hit rates"""
+    return jsonify(intent_matcher.stats())
+
+@app.route('/intents/reload', methods=['POST'])
+def reload_intents():
+    """Reload intent answers from disk without restarting the server"""
+    if not intent_matcher.reload():
+        return jsonify({'error': 'Failed to reload intents. Please check the server logs.'}), 500
+    return jsonify({'reloaded': True, 'intents': intent_matcher.intents})
+
 @app.route('/health')
 def health():
     """Health check endpoint"""
@@ -143,8 +728,12 @@ if __name__ == '__main__':
     print("🚀 Starting AWS Bedrock Support Bot Web Interface")
     print("=" * 50)
     
+    load_static_assets()
+    
     # Initialize AWS connection
     if initialize_aws():
+        if TRAFFIC_LOG:
+            print(f"📼 Recording /chat traffic to {TRAFFIC_LOG}")
         print(f"🌐 Starting web server on http://localhost:5000")
         print("📱 Open your browser and go to: http://localhost:5000")
         print("🛑 Press Ctrl+C to stop the server")
@@ -161,5 +750,5 @@ if __name__ == '__main__':
         print("❌ Failed to initialize. Please check:")
         print("   1. AWS credentials are configured")
         print("   2. Bedrock agent is deployed")
-        print("   3. Agent name contains 'bedrock-support-bot'")
+        print(f"   3. Agent is named '{PROJECT_NAME}-agent' or has the Project tag")
         exit(1)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the completion reader
+Compares string concatenation with CompletionReader on large multi-chunk responses
+"""
+
+import sys
+import time
+from completion_reader import CompletionReader
+
+# Configuration
+RESPONSE_SIZES = [64 * 1024, 1024 * 1024, 8 * 1024 * 1024]  # Bytes
+CHUNK_SIZES = [16, 256, 4096]  # Bytes per completion event
+REPEAT = 3
+SAMPLE_TEXT = "Support answer with accents é, symbols ✓ and emoji 😀. "
+
+def print_status(message):
+    print(f"✅ {message}")
+
+def print_error(message):
+    print(f"❌ {message}")
+
+def print_info(message):
+    print(f"ℹ️  {message}")
+
+def make_chunks(size, chunk_size):
+    """Split a UTF-8 payload into fixed-size chunks, cutting through multi-byte characters"""
+    sample = SAMPLE_TEXT.encode('utf-8')
+    payload = (sample * (size // len(sample) + 1))[:size]
+    return [payload[i:i + chunk_size] for i in range(0, len(payload), chunk_size)]
+
+def concat_reader(chunks):
+    """The original approach: completion += chunk.decode('utf-8')"""
+    completion = ""
+    for chunk in chunks:
+        completion += chunk.decode('utf-8', errors='replace')
+    return completion
+
+def completion_reader(chunks):
+    """Chunks appended to one byte buffer, decoded once"""
+    reader = CompletionReader(max_bytes=sys.maxsize)
+    for chunk in chunks:
+        reader.feed(chunk)
+    return reader.text()
+
+def streaming_reader(chunks):
+    """Incremental decoding delivered to a callback as chunks arrive"""
+    streamed = []
+    reader = CompletionReader(max_bytes=sys.maxsize, on_text=streamed.append)
+    for chunk in chunks:
+        reader.feed(chunk)
+    reader.text()
+    return ''.join(streamed)
+
+def best_time(func, chunks):
+    """Best wall time of REPEAT runs"""
+    best = float('inf')
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = func(chunks)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    """Main benchmark function"""
+    print("⏱️  Completion reader micro-benchmark")
+    print("=" * 50)
+
+    corrupted = 0
+    print(f"{'size':>8} {'chunk':>6} {'concat':>10} {'reader':>10} {'speedup':>8} {'streaming':>10}")
+    for size in RESPONSE_SIZES:
+        for chunk_size in CHUNK_SIZES:
+            chunks = make_chunks(size, chunk_size)
+            expected_text = b''.join(chunks).decode('utf-8', errors='replace')
+            concat_time, concat_text = best_time(concat_reader, chunks)
+            reader_time, reader_text = best_time(completion_reader, chunks)
+            streaming_time, streaming_text = best_time(streaming_reader, chunks)
+            if reader_text != expected_text or streaming_text != expected_text:
+                print_error(f"CompletionReader output mismatch at size={size} chunk={chunk_size}")
+                return 1
+            if concat_text != expected_text:
+                corrupted += 1
+            print(f"{size // 1024:>6}KB {chunk_size:>5}B "
+                  f"{concat_time * 1000:>8.1f}ms {reader_time * 1000:>8.1f}ms "
+                  f"{concat_time / reader_time:>7.2f}x {streaming_time * 1000:>8.1f}ms")
+
+    print("")
+    print_status("CompletionReader output matched the reference decoding in every case")
+    if corrupted:
+        print_info(f"Concatenation corrupted split multi-byte characters in {corrupted} cases")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
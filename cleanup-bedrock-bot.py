@@ -4,21 +4,15 @@ Cleanup script for AWS Bedrock Support Bot
 Removes all resources created by the deployment script
 """
 
-import boto3
 import time
 from botocore.exceptions import ClientError
+import inventory
 
 # Configuration
-PROJECT_NAME = "bedrock-support-bot"
-REGION = "us-east-1"
+REGIONS = inventory.REGIONS  # Override with BOT_REGIONS=us-east-1,us-west-2
 
-# Initialize AWS clients
-session = boto3.Session(region_name=REGION)
-s3 = session.client('s3')
-iam = session.client('iam')
-lambda_client = session.client('lambda')
-bedrock_agent = session.client('bedrock-agent')
-sts = session.client('sts')
+# Initialize AWS clients (shared with the inventory module)
+iam = inventory.client('iam')
 
 def print_status(message):
     print(f"✅ {message}")
@@ -29,59 +23,47 @@ def print_error(message):
 def print_info(message):
     print(f"ℹ️  {message}")
 
-def get_account_id():
-    """Get AWS account ID"""
-    return sts.get_caller_identity()['Account']
-
-def delete_bedrock_agent():
-    """Delete Bedrock agent"""
-    print_info("Deleting Bedrock agent...")
+def delete_bedrock_agents(resources):
+    """Delete Bedrock agents in every region"""
+    print_info("Deleting Bedrock agents...")
     
-    try:
-        # List agents to find ours
-        response = bedrock_agent.list_agents()
-        for agent in response.get('agentSummaries', []):
-            if PROJECT_NAME in agent['agentName']:
-                agent_id = agent['agentId']
-                print_info(f"Found agent: {agent_id}")
-                
-                try:
-                    bedrock_agent.delete_agent(
-                        agentId=agent_id,
-                        skipResourceInUseCheck=True
-                    )
-                    print_status(f"Deleted agent: {agent_id}")
-                except ClientError as e:
-                    print_error(f"Failed to delete agent {agent_id}: {e}")
-                    
-    except ClientError as e:
-        print_error(f"Failed to list/delete agents: {e}")
+    for region, found in resources['regions'].items():
+        bedrock_agent = inventory.client('bedrock-agent', region)
+        for agent in found['agents']:
+            agent_id = agent['id']
+            print_info(f"Found agent: {agent_id} ({region})")
+            
+            try:
+                bedrock_agent.delete_agent(
+                    agentId=agent_id,
+                    skipResourceInUseCheck=True
+                )
+                print_status(f"Deleted agent: {agent_id}")
+            except ClientError as e:
+                print_error(f"Failed to delete agent {agent_id}: {e}")
 
-def delete_lambda_function():
-    """Delete Lambda function"""
-    print_info("Deleting Lambda function...")
+def delete_lambda_functions(resources):
+    """Delete Lambda functions in every region"""
+    print_info("Deleting Lambda functions...")
     
-    function_name = f"{PROJECT_NAME}-fallback-function"
-    
-    try:
-        lambda_client.delete_function(FunctionName=function_name)
-        print_status(f"Deleted Lambda function: {function_name}")
-    except ClientError as e:
-        if e.response['Error']['Code'] == 'ResourceNotFoundException':
-            print_info(f"Lambda function {function_name} not found")
-        else:
-            print_error(f"Failed to delete Lambda function: {e}")
+    for region, found in resources['regions'].items():
+        lambda_client = inventory.client('lambda', region)
+        for function in found['functions']:
+            function_name = function['name']
+            try:
+                lambda_client.delete_function(FunctionName=function_name)
+                print_status(f"Deleted Lambda function: {function_name} ({region})")
+            except ClientError as e:
+                if e.response['Error']['Code'] == 'ResourceNotFoundException':
+                    print_info(f"Lambda function {function_name} not found")
+                else:
+                    print_error(f"Failed to delete Lambda function: {e}")
 
-def delete_iam_roles():
+def delete_iam_roles(resources):
     """Delete IAM roles"""
     print_info("Deleting IAM roles...")
     
-    roles = [
-        f"{PROJECT_NAME}-lambda-role",
-        f"{PROJECT_NAME}-agent-role"
-    ]
-    
-    for role_name in roles:
+    for role_name in resources['roles']:
         try:
             # Detach managed policies
             try:
@@ -115,12 +97,15 @@ def delete_iam_roles():
             else:
                 print_error(f"Failed to delete IAM role {role_name}: {e}")
 
-def delete_s3_bucket():
+def delete_s3_bucket(resources):
     """Delete S3 bucket"""
     print_info("Deleting S3 bucket...")
     
-    account_id = get_account_id()
-    bucket_name = f"{PROJECT_NAME}-kb-content-{account_id}"
+    if not resources['bucket']:
+        print_info("S3 bucket not found")
+        return
+    bucket_name = resources['bucket']['name']
+    s3 = inventory.client('s3', resources['bucket']['region'])
     
     try:
         # Empty bucket first
@@ -151,13 +136,25 @@ def main():
     print("🗑️  Cleaning up AWS Bedrock Support Bot resources")
     print("=" * 50)
     
+    # Always act on a fresh inventory, never a cached one
+    resources = inventory.discover(REGIONS, max_age=0)
+    if inventory.has_errors(resources):
+        inventory.print_inventory(resources)
+        print_error("Discovery was incomplete; some resources may be left behind")
+    else:
+        print_info("The following resources will be deleted:")
+        inventory.print_inventory(resources)
+    print("")
+    
     # Delete in reverse order of creation
-    delete_bedrock_agent()
-    time.sleep(5)  # Wait for agent deletion to propagate
+    if any(found['agents'] for found in resources['regions'].values()):
+        delete_bedrock_agents(resources)
+        time.sleep(5)  # Wait for agent deletion to propagate
     
-    delete_lambda_function()
-    delete_iam_roles()
-    delete_s3_bucket()
+    delete_lambda_functions(resources)
+    delete_iam_roles(resources)
+    delete_s3_bucket(resources)
+    inventory.invalidate_cache()
     
     print("\n" + "=" * 50)
     print_status("Cleanup completed!")
@@ -0,0 +1,96 @@
+"""
+Completion reader for AWS Bedrock Support Bot
+Assembles agent completion chunks with incremental UTF-8 decoding and a size limit
+"""
+
+import codecs
+
+# Configuration
+DEFAULT_MAX_RESPONSE_BYTES = 64 * 1024
+TRUNCATION_NOTICE = "\n\n[Response truncated]"
+
+def utf8_decoder():
+    """Incremental decoder that carries partial multi-byte characters across chunks"""
+    return codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+class CompletionReader:
+    """Collects completion chunks into one byte buffer, decoded once at the end"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_RESPONSE_BYTES, on_text=None):
+        self.max_bytes = max_bytes
+        self.on_text = on_text
+        self.buffer = bytearray()
+        self.truncated = False
+        self.result = None
+        # Only needed when text is streamed to a callback as it arrives
+        self.decoder = utf8_decoder() if on_text else None
+
+    @property
+    def bytes_read(self):
+        return len(self.buffer)
+
+    def feed(self, data):
+        """Append one chunk; returns False once the size limit has been reached"""
+        if self.truncated:
+            return False
+
+        remaining = self.max_bytes - len(self.buffer)
+        if len(data) > remaining:
+            data = data[:remaining]
+            self.truncated = True
+        self.buffer += data
+
+        if self.decoder:
+            text = self.decoder.decode(data)
+            if text:
+                self.on_text(text)
+        return not self.truncated
+
+    def text(self):
+        """Return the assembled completion
+
+        A character cut in half by the size limit is dropped; one left dangling
+        by a complete stream is replaced with U+FFFD.
+        """
+        if self.result is None:
+            if self.truncated:
+                del self.buffer[complete_prefix_length(self.buffer):]
+            # Decode the buffer in place rather than copying it into bytes first
+            self.result = self.buffer.decode('utf-8', errors='replace')
+            if self.decoder and not self.truncated:
+                tail = self.decoder.decode(b'', final=True)
+                if tail:
+                    self.on_text(tail)
+        return self.result
+
+def complete_prefix_length(data):
+    """Length of data without a trailing incomplete UTF-8 sequence"""
+    for back in range(1, min(4, len(data)) + 1):
+        byte = data[-back]
+        if byte & 0xC0 == 0x80:
+            continue  # Continuation byte, keep looking for the lead byte
+        if byte >= 0xF0:
+            needed = 4
+        elif byte >= 0xE0:
+            needed = 3
+        elif byte >= 0xC0:
+            needed = 2
+        else:
+            needed = 1
+        return len(data) - back if needed > back else len(data)
+    return len(data)
+
+def read_completion(event_stream, max_bytes=DEFAULT_MAX_RESPONSE_BYTES, on_text=None, should_stop=None):
+    """Read an invoke_agent completion event stream into a CompletionReader"""
+    reader = CompletionReader(max_bytes, on_text)
+    for event in event_stream:
+        if should_stop and should_stop():
+            break
+        chunk = event.get('chunk')
+        if chunk and 'bytes' in chunk and not reader.feed(chunk['bytes']):
+            # Stop reading so the connection goes back to the pool
+            close = getattr(event_stream, 'close', None)
+            if close:
+                close()
+            break
+    return reader
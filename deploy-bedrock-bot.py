@@ -4,25 +4,23 @@ AWS Bedrock Support Bot Deployment Script
 Pure Python implementation using boto3 - bypasses Terraform limitations
 """
 
-import boto3
 import json
 import time
 import zipfile
 import io
 from botocore.exceptions import ClientError
+import inventory
 
 # Configuration
-PROJECT_NAME = "bedrock-support-bot"
+PROJECT_NAME = inventory.PROJECT_NAME
 REGION = "us-east-1"
 FOUNDATION_MODEL = "amazon.titan-text-premier-v1:0"
 
-# Initialize AWS clients
-session = boto3.Session(region_name=REGION)
-s3 = session.client('s3')
-iam = session.client('iam')
-lambda_client = session.client('lambda')
-bedrock_agent = session.client('bedrock-agent')
-sts = session.client('sts')
+# Initialize AWS clients (shared with the inventory module)
+s3 = inventory.client('s3', REGION)
+iam = inventory.client('iam', REGION)
+lambda_client = inventory.client('lambda', REGION)
+bedrock_agent = inventory.client('bedrock-agent', REGION)
 
 def print_status(message):
     print(f"✅ {message}")
@@ -35,14 +33,13 @@ def print_info(message):
 
 def get_account_id():
     """Get AWS account ID"""
-    return sts.get_caller_identity()['Account']
+    return inventory.get_account_id()
 
 def create_s3_bucket():
     """Create S3 bucket for knowledge base content"""
     print_info("Creating S3 bucket...")
 
-    account_id = get_account_id()
-    bucket_name = f"{PROJECT_NAME}-kb-content-{account_id}"
+    bucket_name = inventory.bucket_name(get_account_id())
 
     try:
         s3.create_bucket(Bucket=bucket_name)
@@ -74,11 +71,17 @@ def create_s3_bucket():
             }
         )
 
+        s3.put_bucket_tagging(Bucket=bucket_name, Tagging={'TagSet': inventory.tag_list()})
+
         print_status(f"S3 bucket created: {bucket_name}")
         return bucket_name
 
     except ClientError as e:
         if e.response['Error']['Code'] == 'BucketAlreadyOwnedByYou':
+            try:
+                s3.put_bucket_tagging(Bucket=bucket_name, Tagging={'TagSet': inventory.tag_list()})
+            except ClientError as tag_error:
+                print_info(f"Could not tag existing S3 bucket {bucket_name}: {tag_error}")
             print_status(f"S3 bucket already exists: {bucket_name}")
             return bucket_name
         else:
@@ -91,12 +94,17 @@ def create_iam_role(role_name, assume_role_policy, description):
         response = iam.create_role(
             RoleName=role_name,
             AssumeRolePolicyDocument=json.dumps(assume_role_policy),
-            Description=description
+            Description=description,
+            Tags=inventory.tag_list()
         )
         print_status(f"IAM role created: {role_name}")
         return response['Role']['Arn']
     except ClientError as e:
         if e.response['Error']['Code'] == 'EntityAlreadyExists':
+            try:
+                iam.tag_role(RoleName=role_name, Tags=inventory.tag_list())
+            except ClientError as tag_error:
+                print_info(f"Could not tag existing IAM role {role_name}: {tag_error}")
             response = iam.get_role(RoleName=role_name)
             print_status(f"IAM role already exists: {role_name}")
             return response['Role']['Arn']
@@ -167,7 +175,8 @@ def handler(event, context):
             Handler='lambda_function.handler',
             Code={'ZipFile': zip_buffer.read()},
             Description='Fallback function for Bedrock support bot',
-            Timeout=30
+            Timeout=30,
+            Tags=inventory.PROJECT_TAGS
         )
 
         # Add permission for Bedrock to invoke Lambda
@@ -185,6 +194,13 @@ def handler(event, context):
     except ClientError as e:
         if e.response['Error']['Code'] == 'ResourceConflictException':
             response = lambda_client.get_function(FunctionName=function_name)
+            try:
+                lambda_client.tag_resource(
+                    Resource=response['Configuration']['FunctionArn'],
+                    Tags=inventory.PROJECT_TAGS
+                )
+            except ClientError as tag_error:
+                print_info(f"Could not tag existing Lambda function {function_name}: {tag_error}")
             print_status(f"Lambda function already exists: {function_name}")
             return response['Configuration']['FunctionArn']
         else:
@@ -246,7 +262,8 @@ def create_bedrock_agent(lambda_arn):
             agentName=f"{PROJECT_NAME}-agent",
             agentResourceRoleArn=agent_role_arn,
             foundationModel=FOUNDATION_MODEL,
-            instruction="You are a helpful support assistant. Answer user questions to the best of your ability."
+            instruction="You are a helpful support assistant. Answer user questions to the best of your ability.",
+            tags=inventory.PROJECT_TAGS
         )
 
         agent_id = response['agent']['agentId']
@@ -334,6 +351,9 @@ def main():
         # Create Bedrock agent (without Knowledge Base for now)
         agent_id = create_bedrock_agent(lambda_arn)
 
+        # New resources must show up in the next status report or app start
+        inventory.invalidate_cache()
+
         print("\n" + "=" * 50)
         print_status("Deployment completed successfully!")
         print(f"S3 Bucket: {bucket_name}")
@@ -0,0 +1,116 @@
+"""
+Intent fast path for AWS Bedrock Support Bot
+Answers high-frequency support questions from a precompiled phrase index
+without invoking the Bedrock agent
+"""
+
+import json
+import os
+import re
+import threading
+import time
+
+# Configuration
+RELOAD_CHECK_INTERVAL = 2.0  # Seconds between intents file change checks
+MAX_FAST_PATH_TOKENS = 12  # Longer messages always go to the agent
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+FILLER_WORDS = frozenset([
+    'a', 'an', 'the', 'i', 'im', 'me', 'my', 'you', 'your', 'can', 'could',
+    'would', 'will', 'please', 'just', 'do', 'is', 'am', 'are', 'there', 'some'
+])
+
+def normalize(text):
+    """Reduce a message to its set of content tokens"""
+    tokens = TOKEN_PATTERN.findall(text.lower().replace("'", "").replace("’", ""))
+    return frozenset(token for token in tokens if token not in FILLER_WORDS)
+
+def compile_index(intents):
+    """Build the token-set -> (intent, answer) lookup table"""
+    index = {}
+    for name, spec in intents.items():
+        answer = spec['answer']
+        for phrase in spec.get('phrases', []):
+            key = normalize(phrase)
+            if key:
+                index[key] = (name, answer)
+    return index
+
+class IntentMatcher:
+    """Precompiled intent index with hot reload and per-intent hit counters"""
+
+    def __init__(self, path):
+        self.path = path
+        self.index = {}
+        self.intents = []
+        self.loaded_mtime = None
+        self.next_check = 0.0
+        self.lookups = 0
+        self.hits = {}
+        self.lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        """Recompile the index from the intents file; keeps the old index on failure"""
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, encoding='utf-8') as f:
+                intents = json.load(f)
+            index = compile_index(intents)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"❌ Failed to load intents from {self.path}: {e}")
+            return False
+
+        # Single assignment so concurrent lookups see either the old or the new index
+        self.index = index
+        self.intents = list(intents)
+        self.loaded_mtime = mtime
+        with self.lock:
+            for name in self.intents:
+                self.hits.setdefault(name, 0)
+        print(f"✅ Loaded {len(self.intents)} intents ({len(index)} phrase variants) from {self.path}")
+        return True
+
+    def maybe_reload(self):
+        """Reload if the intents file changed, checking at most every RELOAD_CHECK_INTERVAL"""
+        now = time.monotonic()
+        if now < self.next_check:
+            return
+        self.next_check = now + RELOAD_CHECK_INTERVAL
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self.loaded_mtime:
+            self.reload()
+
+    def match(self, message):
+        """Return (intent, answer) for a configured intent, or None"""
+        self.maybe_reload()
+        key = normalize(message)
+        result = self.index.get(key) if 0 < len(key) <= MAX_FAST_PATH_TOKENS else None
+        with self.lock:
+            self.lookups += 1
+            if result:
+                self.hits[result[0]] = self.hits.get(result[0], 0) + 1
+        return result
+
+    def stats(self):
+        """Per-intent hit counts and hit rates over all fast path lookups"""
+        with self.lock:
+            lookups = self.lookups
+            hits = dict(self.hits)
+        total_hits = sum(hits.values())
+        return {
+            'lookups': lookups,
+            'hits': total_hits,
+            'hit_rate': total_hits / lookups if lookups else 0.0,
+            'intents': {
+                name: {
+                    'hits': count,
+                    'hit_rate': count / lookups if lookups else 0.0,
+                    'active': name in self.intents
+                }
+                for name, count in hits.items()
+            }
+        }
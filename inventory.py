@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Resource inventory for AWS Bedrock Support Bot
+Discovers the project's agents, functions, roles and buckets across regions in parallel,
+with shared clients and a short-lived local cache
+"""
+
+import boto3
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+# Configuration
+PROJECT_NAME = "bedrock-support-bot"
+REGIONS = [r.strip() for r in os.environ.get('BOT_REGIONS', 'us-east-1').split(',') if r.strip()]
+PROJECT_TAGS = {'Project': PROJECT_NAME, 'ManagedBy': 'deploy-bedrock-bot'}
+# Names deploy-bedrock-bot.py gives its resources, matched for deployments made before tagging
+PROJECT_AGENTS = [f"{PROJECT_NAME}-agent"]
+PROJECT_ROLES = [f"{PROJECT_NAME}-lambda-role", f"{PROJECT_NAME}-agent-role"]
+PROJECT_FUNCTIONS = [f"{PROJECT_NAME}-fallback-function"]
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.inventory-cache.json')
+CACHE_TTL = 60  # Seconds a discovered inventory is reused
+MAX_WORKERS = 16  # Parallel discovery calls
+
+# Shared sessions and clients, one per (profile) and (service, region, profile)
+sessions = {}
+clients = {}
+account_ids = {}
+clients_lock = threading.Lock()
+
+class DiscoveryError(Exception):
+    """Raised when a lookup needed to answer a query failed"""
+
+def print_status(message):
+    print(f"✅ {message}")
+
+def print_error(message):
+    print(f"❌ {message}")
+
+def print_info(message):
+    print(f"ℹ️  {message}")
+
+def tag_list():
+    """PROJECT_TAGS in the [{'Key': ..., 'Value': ...}] form used by S3 and IAM"""
+    return [{'Key': key, 'Value': value} for key, value in PROJECT_TAGS.items()]
+
+def get_session(profile=None):
+    """Return the shared boto3 session for a profile"""
+    with clients_lock:
+        if profile not in sessions:
+            sessions[profile] = boto3.Session(profile_name=profile) if profile else boto3.Session()
+        return sessions[profile]
+
+def client(service_name, region=None, profile=None, **config):
+    """Return a shared client; boto3 clients are thread-safe, session.client() is not"""
+    key = (service_name, region, profile, repr(sorted(config.items())))  # Config values may be dicts
+    session = get_session(profile)
+    with clients_lock:
+        if key not in clients:
+            clients[key] = session.client(
+                service_name,
+                region_name=region or REGIONS[0],
+                config=Config(**config) if config else None
+            )
+        return clients[key]
+
+def get_account_id(profile=None):
+    """Get AWS account ID, calling STS once per profile"""
+    if profile not in account_ids:
+        account_ids[profile] = client('sts', profile=profile).get_caller_identity()['Account']
+    return account_ids[profile]
+
+def bucket_name(account_id):
+    return f"{PROJECT_NAME}-kb-content-{account_id}"
+
+def paginate(service_client, operation, result_key, **kwargs):
+    """Yield every item of a paginated list operation"""
+    for page in service_client.get_paginator(operation).paginate(**kwargs):
+        yield from page.get(result_key, [])
+
+def list_tagged_arns(region, profile):
+    """ARNs in a region carrying the Project tag"""
+    tagging = client('resourcegroupstaggingapi', region, profile)
+    return [
+        resource['ResourceARN']
+        for resource in paginate(
+            tagging, 'get_resources', 'ResourceTagMappingList',
+            TagFilters=[{'Key': 'Project', 'Values': [PROJECT_NAME]}]
+        )
+    ]
+
+def list_agents(region, profile):
+    """All agent summaries in a region"""
+    return list(paginate(client('bedrock-agent', region, profile), 'list_agents', 'agentSummaries'))
+
+def list_functions(region, profile):
+    """All Lambda functions in a region"""
+    return list(paginate(client('lambda', region, profile), 'list_functions', 'Functions'))
+
+def has_project_tag(tags):
+    return any(tag['Key'] == 'Project' and tag['Value'] == PROJECT_NAME for tag in tags)
+
+def list_roles(profile):
+    """Project IAM roles (IAM is global): the deployment's own names, or tagged with Project"""
+    iam = client('iam', profile=profile)
+    roles = []
+    for role in paginate(iam, 'list_roles', 'Roles'):
+        name = role['RoleName']
+        if name in PROJECT_ROLES:
+            roles.append(name)
+        elif name.startswith(PROJECT_NAME):
+            # A shared prefix alone is not proof of ownership
+            try:
+                if has_project_tag(paginate(iam, 'list_role_tags', 'Tags', RoleName=name)):
+                    roles.append(name)
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'NoSuchEntity':
+                    raise
+    return roles
+
+def find_bucket(profile):
+    """The deployment's content bucket and its region, or None"""
+    s3 = client('s3', profile=profile)
+    name = bucket_name(get_account_id(profile))
+    try:
+        location = s3.get_bucket_location(Bucket=name).get('LocationConstraint')
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('NoSuchBucket', '404'):
+            return None
+        raise
+    return {'name': name, 'region': location or 'us-east-1'}
+
+def arn_suffix(arn, marker):
+    """Resource name or ID following marker in an ARN, e.g. ':agent/' or ':function:'"""
+    return arn.split(marker, 1)[1] if marker in arn else None
+
+def build_region(region, results):
+    """Combine tag lookups with name matching for resources deployed before tagging"""
+    tagged = results.get(('tagged', region)) or []
+    tagged_agents = {arn_suffix(arn, ':agent/') for arn in tagged}
+    tagged_functions = {arn_suffix(arn, ':function:') for arn in tagged}
+    return {
+        'agents': [
+            {'id': agent['agentId'], 'name': agent['agentName'], 'status': agent.get('agentStatus')}
+            for agent in results.get(('agents', region)) or []
+            if agent['agentName'] in PROJECT_AGENTS or agent['agentId'] in tagged_agents
+        ],
+        'functions': [
+            {'name': function['FunctionName'], 'arn': function['FunctionArn']}
+            for function in results.get(('functions', region)) or []
+            if function['FunctionName'] in PROJECT_FUNCTIONS or function['FunctionName'] in tagged_functions
+        ],
+        'errors': {
+            kind: results[(kind, region, 'error')]
+            for kind in ('tagged', 'agents', 'functions')
+            if (kind, region, 'error') in results
+        }
+    }
+
+def scan(regions, profile, include_global):
+    """Run every discovery call in parallel and assemble the inventory"""
+    tasks = {}
+    for region in regions:
+        tasks[('tagged', region)] = (list_tagged_arns, region, profile)
+        tasks[('agents', region)] = (list_agents, region, profile)
+        tasks[('functions', region)] = (list_functions, region, profile)
+    if include_global:
+        tasks[('roles',)] = (list_roles, profile)
+        tasks[('bucket',)] = (find_bucket, profile)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(tasks))) as pool:
+        futures = {key: pool.submit(func, *args) for key, (func, *args) in tasks.items()}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                # One unreachable region or missing permission should not hide the rest
+                results[key + ('error',)] = str(e)
+
+    inventory = {
+        'profile': profile,
+        'generated': time.time(),
+        'regions': {region: build_region(region, results) for region in regions}
+    }
+    if include_global:
+        inventory['roles'] = results.get(('roles',), [])
+        inventory['bucket'] = results.get(('bucket',))
+        inventory['errors'] = {
+            key[0]: results[key + ('error',)] for key in (('roles',), ('bucket',)) if key + ('error',) in results
+        }
+    return inventory
+
+def cache_key(regions, profile, include_global):
+    return f"{profile or 'default'}|{','.join(regions)}|{'global' if include_global else 'regional'}"
+
+def load_cache():
+    try:
+        with open(CACHE_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_cache(cache):
+    try:
+        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+    except OSError as e:
+        print_error(f"Failed to write inventory cache: {e}")
+
+def invalidate_cache():
+    """Forget cached inventories, e.g. after deploying or deleting resources"""
+    try:
+        os.remove(CACHE_FILE)
+    except OSError:
+        pass
+
+def has_errors(inventory):
+    return bool(inventory.get('errors')) or any(r['errors'] for r in inventory['regions'].values())
+
+def discover(regions=None, profile=None, max_age=CACHE_TTL, include_global=True):
+    """Return the project inventory, reusing a cached one younger than max_age seconds"""
+    regions = list(regions or REGIONS)
+    key = cache_key(regions, profile, include_global)
+    cache = load_cache()
+    cached = cache.get(key)
+    if cached and time.time() - cached['generated'] < max_age:
+        return cached
+
+    inventory = scan(regions, profile, include_global)
+    # Don't let a transient failure hide resources for the next CACHE_TTL seconds
+    if not has_errors(inventory):
+        cache[key] = inventory
+        save_cache(cache)
+    return inventory
+
+def find_agent(region, profile=None, max_age=CACHE_TTL):
+    """ID of the project's agent in a region, or None; raises DiscoveryError when the lookup failed"""
+    inventory = discover([region], profile, max_age, include_global=False)
+    found = inventory['regions'][region]
+    # Prefer an agent that can serve requests over one still being created or deleted
+    agents = sorted(found['agents'], key=lambda agent: agent.get('status') != 'PREPARED')
+    errors = found['errors']
+    if 'agents' in errors or (not agents and 'tagged' in errors):
+        raise DiscoveryError(f"Agent lookup in {region} failed: {errors.get('agents') or errors['tagged']}")
+    return agents[0]['id'] if agents else None
+
+def print_inventory(inventory):
+    """Status report of everything the project has deployed"""
+    age = time.time() - inventory['generated']
+    print_info(f"Inventory generated {age:.0f}s ago")
+    for region, resources in inventory['regions'].items():
+        print(f"\n🌍 {region}")
+        for agent in resources['agents']:
+            print(f"   🤖 Agent {agent['name']} ({agent['id']}) - {agent['status']}")
+        for function in resources['functions']:
+            print(f"   ⚡ Lambda {function['name']}")
+        if not resources['agents'] and not resources['functions']:
+            print("   (no resources)")
+        for kind, error in resources['errors'].items():
+            print_error(f"{kind} lookup failed: {error}")
+    if 'roles' in inventory:
+        print("\n🌐 Global")
+        for role in inventory['roles']:
+            print(f"   👤 IAM role {role}")
+        if inventory['bucket']:
+            print(f"   🪣 S3 bucket {inventory['bucket']['name']} ({inventory['bucket']['region']})")
+        for kind, error in inventory['errors'].items():
+            print_error(f"{kind} lookup failed: {error}")
+
+def main():
+    """Print a status report of deployed resources across REGIONS"""
+    profile = os.environ.get('AWS_PROFILE')
+    max_age = 0 if '--refresh' in sys.argv else CACHE_TTL
+
+    print("📋 AWS Bedrock Support Bot inventory")
+    print("=" * 50)
+    print_info(f"Regions: {', '.join(REGIONS)}")
+
+    start = time.perf_counter()
+    inventory = discover(profile=profile, max_age=max_age)
+    elapsed = time.perf_counter() - start
+
+    if '--json' in sys.argv:
+        print(json.dumps(inventory, indent=2))
+    else:
+        print_inventory(inventory)
+    print("")
+    print_status(f"Inventory ready in {elapsed:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Asynchronous jobs for AWS Bedrock Support Bot
+Runs agent invocations in a bounded worker pool and keeps results in a TTL store
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+class JobQueueFull(Exception):
+    """Raised when no more jobs can be accepted"""
+
+class Job:
+    """One background question and its (partial) answer"""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = 'queued'
+        self.created = time.time()
+        self.submitted = time.monotonic()  # Deadlines count from here, including time waiting for a worker
+        self.started = None
+        self.finished = None
+        self.parts = []
+        self.result = None
+        self.error = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            self.status = 'running'
+            self.started = time.time()
+
+    def append_text(self, text):
+        """Streaming callback for partial completion text"""
+        with self.lock:
+            self.parts.append(text)
+
+    def complete(self, result):
+        with self.lock:
+            self.status = 'completed'
+            self.result = result
+            self.finished = time.time()
+
+    def fail(self, error):
+        with self.lock:
+            self.status = 'failed'
+            self.error = error
+            self.finished = time.time()
+
+    @property
+    def done(self):
+        return self.finished is not None
+
+    def to_dict(self):
+        with self.lock:
+            job = {
+                'job_id': self.id,
+                'status': self.status,
+                'created': self.created,
+                'started': self.started,
+                'finished': self.finished
+            }
+            if self.status == 'running':
+                job['partial'] = ''.join(self.parts)
+            elif self.status == 'completed':
+                job['response'] = self.result
+            elif self.status == 'failed':
+                job['error'] = self.error
+            return job
+
+class JobStore:
+    """Insertion-ordered job store bounded by entry count, expiring finished jobs after a TTL"""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+
+    def expire(self):
+        """Drop finished jobs older than the TTL; caller holds the lock"""
+        now = time.time()
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.done and now - job.finished > self.ttl]:
+            del self.jobs[job_id]
+
+    def add(self, job):
+        """Store a new job, evicting the oldest finished jobs when at capacity"""
+        with self.lock:
+            self.expire()
+            if len(self.jobs) >= self.max_entries:
+                for job_id in [job_id for job_id, stored in self.jobs.items() if stored.done]:
+                    del self.jobs[job_id]
+                    if len(self.jobs) < self.max_entries:
+                        break
+            if len(self.jobs) >= self.max_entries:
+                raise JobQueueFull("Job store is full of unfinished jobs")
+            self.jobs[job.id] = job
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job and job.done and time.time() - job.finished > self.ttl:
+                del self.jobs[job_id]
+                return None
+            return job
+
+    def counts(self):
+        with self.lock:
+            self.expire()
+            counts = {}
+            for job in self.jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return counts
+
+class JobRunner:
+    """Bounded worker pool; rejects new jobs once max_pending are queued or running"""
+
+    def __init__(self, store, workers, max_pending):
+        self.store = store
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self.pending = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, target, *args):
+        """Run target(job, *args) in the background; its return value becomes the result"""
+        if not self.pending.acquire(blocking=False):
+            raise JobQueueFull("Too many pending jobs")
+        job = Job()
+        try:
+            self.store.add(job)
+            self.pool.submit(self.run, job, target, args)
+        except Exception:
+            self.pending.release()
+            raise
+        return job
+
+    def run(self, job, target, args):
+        try:
+            job.complete(target(job, *args))
+        except Exception as e:
+            job.fail(str(e))
+        finally:
+            self.pending.release()
+
+    def stats(self):
+        return self.store.counts()
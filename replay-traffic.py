@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Traffic replay tool for AWS Bedrock Support Bot
+Re-drives a recorded /chat traffic log against a running server and reports latency
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# Configuration
+DEFAULT_URL = "http://localhost:5000"
+DEFAULT_CONCURRENCY = 16
+REQUEST_TIMEOUT = 120  # seconds
+FILLER_TEXT = "Please explain how my account settings and billing options work. "  # Stands in for unrecorded messages
+
+def print_status(message):
+    print(f"✅ {message}")
+
+def print_error(message):
+    print(f"❌ {message}")
+
+def print_info(message):
+    print(f"ℹ️  {message}")
+
+def load_trace(path):
+    """Load recorded arrivals, sorted by timestamp"""
+    entries = []
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                print_error(f"Skipping malformed line {line_number}")
+                continue
+            if 'timestamp' not in entry:
+                continue
+            if 'message' not in entry and 'length' in entry:
+                # Logged with TRAFFIC_LOG_MESSAGES=hash: replay a message of the recorded length
+                entry['message'] = (FILLER_TEXT * (entry['length'] // len(FILLER_TEXT) + 1))[:entry['length']]
+            if 'message' in entry:
+                entries.append(entry)
+    entries.sort(key=lambda e: e['timestamp'])
+    return entries
+
+def parse_speed(value):
+    """Parse a speed factor: '1', '2.5', '10x' or 'max' (no pacing)"""
+    if value.lower() == 'max':
+        return None
+    factor = float(value.lower().rstrip('x'))
+    if factor <= 0:
+        raise argparse.ArgumentTypeError("speed must be positive or 'max'")
+    return factor
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def replay_headers(entry, api_key):
+    """Headers for one arrival; with a replay API key the server schedules it as the recorded client and lane"""
+    headers = {'Content-Type': 'application/json'}
+    if api_key:
+        headers['X-Api-Key'] = api_key
+        if entry.get('client'):
+            headers['X-Replay-Client'] = entry['client']
+            headers['X-Replay-Lane'] = entry.get('lane') or 'batch'
+    return headers
+
+def send_chat(url, message, headers):
+    """POST one message to /chat, returning (status, latency)"""
+    body = json.dumps({'message': message}).encode('utf-8')
+    req = urllib.request.Request(
+        f"{url}/chat",
+        data=body,
+        headers=headers,
+        method='POST'
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = 0  # Connection failure or timeout
+    return status, time.perf_counter() - start
+
+def replay(entries, url, speed, concurrency, api_key=None):
+    """Re-drive the trace, preserving inter-arrival gaps scaled by speed"""
+    results = []
+    results_lock = threading.Lock()
+
+    def run(entry, scheduled):
+        status, service_time = send_chat(url, entry['message'], replay_headers(entry, api_key))
+        # Measured from the scheduled arrival so time queued behind --concurrency
+        # counts, instead of being silently omitted
+        response_time = time.perf_counter() - scheduled
+        with results_lock:
+            results.append((status, response_time, service_time, entry))
+
+    origin = entries[0]['timestamp']
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for entry in entries:
+            scheduled = time.perf_counter()
+            if speed is not None:
+                scheduled = start + (entry['timestamp'] - origin) / speed
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            pool.submit(run, entry, scheduled)
+    return results, time.perf_counter() - start
+
+def print_distribution(label, latencies):
+    """Print a latency distribution summary"""
+    latencies = sorted(latencies)
+    if not latencies:
+        print(f"{label}: no samples")
+        return
+    mean = sum(latencies) / len(latencies)
+    print(f"{label} (n={len(latencies)}): "
+          f"mean={mean * 1000:.0f}ms "
+          f"p50={percentile(latencies, 50) * 1000:.0f}ms "
+          f"p90={percentile(latencies, 90) * 1000:.0f}ms "
+          f"p99={percentile(latencies, 99) * 1000:.0f}ms "
+          f"max={latencies[-1] * 1000:.0f}ms")
+
+def main():
+    """Main replay function"""
+    parser = argparse.ArgumentParser(description="Replay a recorded /chat traffic log")
+    parser.add_argument('trace', help="JSONL traffic log recorded by app.py (TRAFFIC_LOG)")
+    parser.add_argument('--url', default=DEFAULT_URL, help=f"server base URL (default {DEFAULT_URL})")
+    parser.add_argument('--speed', type=parse_speed, default=1.0,
+                        help="replay speed: 1 (real time), N (N times faster) or 'max'")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"maximum in-flight requests (default {DEFAULT_CONCURRENCY})")
+    parser.add_argument('--limit', type=int, help="replay only the first N arrivals")
+    parser.add_argument('--api-key', default=os.environ.get('REPLAY_API_KEY'),
+                        help="API key configured with \"replay\": true on the server, so arrivals keep their "
+                             "recorded client and lane (default $REPLAY_API_KEY)")
+    args = parser.parse_args()
+
+    print("📼 Replaying Bedrock Support Bot traffic")
+    print("=" * 50)
+
+    entries = load_trace(args.trace)
+    if args.limit:
+        entries = entries[:args.limit]
+    if not entries:
+        print_error("Trace is empty")
+        return 1
+
+    span = entries[-1]['timestamp'] - entries[0]['timestamp']
+    speed_label = 'max' if args.speed is None else f"{args.speed:g}x"
+    print_info(f"{len(entries)} arrivals over {span:.1f}s, replaying at {speed_label} against {args.url}")
+
+    if not args.api_key:
+        print_info("No --api-key: every arrival shares this machine's rate limit, expect 429s above 1 req/s")
+    results, elapsed = replay(entries, args.url, args.speed, args.concurrency, args.api_key)
+
+    statuses = {}
+    for status, _, _, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+
+    print("")
+    print("=" * 50)
+    print_status(f"Replayed {len(results)} requests in {elapsed:.1f}s ({len(results) / elapsed:.1f} req/s)")
+    print("Status codes: " + ", ".join(
+        f"{'conn-error' if code == 0 else code}={count}" for code, count in sorted(statuses.items())))
+    print_distribution("Response time (all)", [response for _, response, _, _ in results])
+    print_distribution("Response time (2xx)", [response for status, response, _, _ in results if 200 <= status < 300])
+    print_distribution("Service time (all)", [service for _, _, service, _ in results])
+    print_distribution("Queueing delay", [response - service for _, response, service, _ in results])
+    print_distribution("Recorded latency", [e['latency'] for e in entries if 'latency' in e])
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
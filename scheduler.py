@@ -0,0 +1,242 @@
+"""
+Fair scheduler for AWS Bedrock Support Bot
+Per-client rate limits, weighted fair queuing and priority lanes in front of the agent
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Lanes in priority order: a free slot always goes to the first non-empty lane
+LANES = ['interactive', 'batch']
+
+class RateLimited(Exception):
+    """Raised when a client has used up its token bucket"""
+
+    def __init__(self, client_id, retry_after):
+        super().__init__(f"Rate limit exceeded for {client_id}")
+        self.retry_after = retry_after
+
+class QueueTimeout(Exception):
+    """Raised when a request waits in the queue past its timeout"""
+
+class QueueFull(Exception):
+    """Raised when a lane already holds its maximum number of waiting requests"""
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, up to `burst`"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self):
+        """Take one token; returns 0 on success or the seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+class Ticket:
+    """One queued request"""
+
+    def __init__(self, client_id, lane, finish_tag):
+        self.client_id = client_id
+        self.lane = lane
+        self.finish_tag = finish_tag
+        self.enqueued = time.monotonic()
+        self.granted = False
+        self.abandoned = False
+
+def new_counters():
+    return {'queued': 0, 'in_flight': 0, 'granted': 0, 'rate_limited': 0, 'rejected': 0,
+            'timed_out': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0}
+
+class FairScheduler:
+    """Admits requests to a fixed number of upstream slots
+
+    Clients are rate limited with token buckets. Within a lane, waiting requests
+    are served by weighted fair queuing on virtual finish tags, so a client
+    flooding the lane only delays its own requests. Lanes are served in
+    priority order and `reserved_slots` are kept free for the interactive lane.
+    Per-client state is dropped once a client has been idle long enough for its
+    bucket to refill, so the tables only hold recently active clients.
+    """
+
+    def __init__(self, max_concurrent, reserved_slots=0, client_rate=1.0, client_burst=10,
+                 client_weights=None, max_queue=100):
+        self.max_concurrent = max_concurrent
+        self.reserved_slots = reserved_slots
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.client_weights = client_weights or {}
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.queues = {lane: [] for lane in LANES}
+        self.virtual_time = {lane: 0.0 for lane in LANES}
+        self.last_finish = {}
+        self.buckets = {}
+        self.lane_stats = {lane: new_counters() for lane in LANES}
+        self.client_stats = {}
+        self.last_seen = OrderedDict()  # Client ID -> last activity, oldest first
+        self.idle_after = client_burst / client_rate  # Seconds for an empty bucket to refill
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+
+    def lane_limit(self, lane):
+        """Slots a lane may occupy; lower-priority lanes leave the reserve free"""
+        return self.max_concurrent if lane == LANES[0] else self.max_concurrent - self.reserved_slots
+
+    def counters(self, client_id):
+        if client_id not in self.client_stats:
+            self.client_stats[client_id] = new_counters()
+        return self.client_stats[client_id]
+
+    def touch(self, client_id):
+        """Mark a client as active; caller holds the lock"""
+        self.last_seen[client_id] = time.monotonic()
+        self.last_seen.move_to_end(client_id)
+
+    def expire_idle(self):
+        """Forget clients idle for idle_after seconds; caller holds the lock
+
+        By then the client's bucket is full again, so a fresh one is equivalent.
+        """
+        now = time.monotonic()
+        while self.last_seen:
+            client_id, seen = next(iter(self.last_seen.items()))
+            if now - seen < self.idle_after:
+                break
+            stats = self.client_stats.get(client_id)
+            if stats and (stats['queued'] or stats['in_flight']):
+                self.touch(client_id)  # Still waiting or running; check again later
+                continue
+            del self.last_seen[client_id]
+            self.buckets.pop(client_id, None)
+            self.client_stats.pop(client_id, None)
+            for lane in LANES:
+                self.last_finish.pop((lane, client_id), None)
+
+    def dispatch(self):
+        """Grant free slots to waiting tickets; caller holds the lock"""
+        granted = False
+        for lane in LANES:
+            queue = self.queues[lane]
+            while queue and self.in_flight < self.lane_limit(lane):
+                _, _, ticket = heapq.heappop(queue)
+                if ticket.abandoned:
+                    continue
+                self.virtual_time[lane] = ticket.finish_tag
+                self.grant(ticket)
+                granted = True
+        if granted:
+            self.condition.notify_all()
+
+    def grant(self, ticket):
+        waited = time.monotonic() - ticket.enqueued
+        ticket.granted = True
+        self.in_flight += 1
+        for stats in (self.lane_stats[ticket.lane], self.counters(ticket.client_id)):
+            stats['queued'] -= 1
+            stats['in_flight'] += 1
+            stats['granted'] += 1
+            stats['wait_seconds'] += waited
+            stats['max_wait_seconds'] = max(stats['max_wait_seconds'], waited)
+
+    def take_token(self, client_id, lane):
+        """Charge one request to the client's token bucket, raising RateLimited when empty"""
+        with self.condition:
+            self.expire_idle()
+            self.touch(client_id)
+            bucket = self.buckets.get(client_id)
+            if bucket is None:
+                bucket = self.buckets[client_id] = TokenBucket(self.client_rate, self.client_burst)
+            retry_after = bucket.take()
+            if retry_after:
+                self.lane_stats[lane]['rate_limited'] += 1
+                self.counters(client_id)['rate_limited'] += 1
+                raise RateLimited(client_id, retry_after)
+
+    def acquire(self, client_id, lane, timeout=None, rate_limit=True):
+        """Block until the request may call upstream; returns a ticket for release()
+
+        Pass rate_limit=False when the request was already charged with take_token().
+        """
+        if lane not in self.queues:
+            raise ValueError(f"Unknown lane: {lane}")
+        if rate_limit:
+            self.take_token(client_id, lane)
+
+        with self.condition:
+            if self.lane_stats[lane]['queued'] >= self.max_queue:
+                self.lane_stats[lane]['rejected'] += 1
+                self.counters(client_id)['rejected'] += 1
+                raise QueueFull(f"Lane {lane} queue is full")
+
+            self.expire_idle()
+            self.touch(client_id)
+            weight = self.client_weights.get(client_id, 1.0)
+            start_tag = max(self.virtual_time[lane], self.last_finish.get((lane, client_id), 0.0))
+            ticket = Ticket(client_id, lane, start_tag + 1.0 / weight)
+            self.last_finish[(lane, client_id)] = ticket.finish_tag
+            heapq.heappush(self.queues[lane], (ticket.finish_tag, next(self.sequence), ticket))
+            self.lane_stats[lane]['queued'] += 1
+            self.counters(client_id)['queued'] += 1
+            self.dispatch()
+
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not ticket.granted:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    ticket.abandoned = True
+                    for stats in (self.lane_stats[lane], self.counters(client_id)):
+                        stats['queued'] -= 1
+                        stats['timed_out'] += 1
+                    raise QueueTimeout(f"Timed out waiting for an upstream slot ({lane})")
+                self.condition.wait(remaining)
+            return ticket
+
+    def release(self, ticket):
+        """Return a slot taken by acquire()"""
+        with self.condition:
+            self.in_flight -= 1
+            self.lane_stats[ticket.lane]['in_flight'] -= 1
+            self.counters(ticket.client_id)['in_flight'] -= 1
+            self.touch(ticket.client_id)
+            self.dispatch()
+
+    @contextmanager
+    def slot(self, client_id, lane, timeout=None, rate_limit=True):
+        """Hold an upstream slot for the duration of the block"""
+        ticket = self.acquire(client_id, lane, timeout, rate_limit)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def stats(self):
+        """Queue depth, in-flight and wait-time metrics by lane and by client"""
+        def summarize(counters):
+            summary = dict(counters)
+            granted = counters['granted']
+            summary['avg_wait_seconds'] = round(counters['wait_seconds'] / granted, 4) if granted else 0.0
+            summary['wait_seconds'] = round(counters['wait_seconds'], 4)
+            summary['max_wait_seconds'] = round(counters['max_wait_seconds'], 4)
+            return summary
+
+        with self.condition:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'in_flight': self.in_flight,
+                'tracked_clients': len(self.last_seen),
+                'lanes': {lane: summarize(counters) for lane, counters in self.lane_stats.items()},
+                'clients': {client: summarize(counters) for client, counters in self.client_stats.items()}
+            }
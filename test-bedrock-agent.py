@@ -4,16 +4,19 @@ Test script for AWS Bedrock Support Bot
 Tests the deployed agent with various queries
 """
 
-import boto3
 import json
 import time
 import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from botocore.exceptions import ClientError
+from completion_reader import read_completion
+import inventory
 
 # Configuration
 REGION = "us-east-1"
 PROFILE = "bedrock-user"  # Use your AWS profile
-PROJECT_NAME = "bedrock-support-bot"
+INTERACTIVE_MAX_BACKGROUND = 4  # Concurrent background queries in interactive mode
 
 def print_status(message):
     print(f"✅ {message}")
@@ -30,27 +33,19 @@ def print_test(message):
 def get_bedrock_agent_id():
     """Find the Bedrock agent ID"""
     try:
-        session = boto3.Session(profile_name=PROFILE, region_name=REGION)
-        bedrock_agent = session.client('bedrock-agent')
+        agent_id = inventory.find_agent(REGION, PROFILE)
+        if not agent_id:
+            print_error("No Bedrock agent found with project name")
+        return agent_id
         
-        response = bedrock_agent.list_agents()
-        
-        for agent in response.get('agentSummaries', []):
-            if PROJECT_NAME in agent['agentName']:
-                return agent['agentId']
-        
-        print_error("No Bedrock agent found with project name")
-        return None
-        
-    except ClientError as e:
+    except inventory.DiscoveryError as e:
         print_error(f"Failed to list agents: {e}")
         return None
 
 def test_agent(agent_id, test_message, test_name):
     """Test the agent with a specific message"""
     try:
-        session = boto3.Session(profile_name=PROFILE, region_name=REGION)
-        bedrock_runtime = session.client('bedrock-agent-runtime')
+        bedrock_runtime = inventory.client('bedrock-agent-runtime', REGION, PROFILE)
         
         session_id = f"test-{uuid.uuid4().hex[:8]}"
         
@@ -67,11 +62,10 @@ def test_agent(agent_id, test_message, test_name):
         # Extract the completion from the response
         completion = ""
         if 'completion' in response:
-            for event in response['completion']:
-                if 'chunk' in event:
-                    chunk = event['chunk']
-                    if 'bytes' in chunk:
-                        completion += chunk['bytes'].decode('utf-8')
+            reader = read_completion(response['completion'])
+            completion = reader.text()
+            if reader.truncated:
+                print_info(f"Response truncated at {reader.bytes_read} bytes")
         
         print(f"Response: {completion}")
         print("-" * 50)
@@ -84,8 +78,7 @@ def test_agent(agent_id, test_message, test_name):
 def test_agent_simple(agent_id, test_message, test_name):
     """Simplified test method"""
     try:
-        session = boto3.Session(profile_name=PROFILE, region_name=REGION)
-        bedrock_runtime = session.client('bedrock-agent-runtime')
+        bedrock_runtime = inventory.client('bedrock-agent-runtime', REGION, PROFILE)
         
         session_id = f"test-{int(time.time())}"
         
@@ -153,8 +146,45 @@ def main():
     else:
         print_error(f"Some tests failed. Check the error messages above.")
 
+def create_runtime_client(max_connections=INTERACTIVE_MAX_BACKGROUND + 1):
+    """Return one pooled bedrock-agent-runtime client to reuse across turns"""
+    return inventory.client(
+        'bedrock-agent-runtime', REGION, PROFILE,
+        max_pool_connections=max_connections, tcp_keepalive=True
+    )
+
+def stream_turn(bedrock_runtime, agent_id, session_id, message, on_text):
+    """Invoke the agent and pass completion text to on_text as it arrives
+
+    Returns (time to first token, total latency) in seconds.
+    """
+    start = time.perf_counter()
+    first_token = None
+
+    def on_chunk(text):
+        nonlocal first_token
+        if first_token is None:
+            first_token = time.perf_counter() - start
+        on_text(text)
+
+    response = bedrock_runtime.invoke_agent(
+        agentId=agent_id,
+        agentAliasId='TSTALIASID',
+        sessionId=session_id,
+        inputText=message
+    )
+    reader = read_completion(response.get('completion', []), on_text=on_chunk)
+    reader.text()  # Flush any dangling partial character
+    if reader.truncated:
+        on_text(f" [truncated at {reader.bytes_read} bytes]")
+    return first_token, time.perf_counter() - start
+
+def format_timing(first_token, total):
+    ttft = f"{first_token:.2f}s" if first_token is not None else "n/a"
+    return f"TTFT {ttft}, total {total:.2f}s"
+
 def interactive_test():
-    """Interactive testing mode"""
+    """Interactive streaming REPL"""
     print("🤖 Interactive Bedrock Agent Test")
     print("=" * 40)
     
@@ -164,10 +194,25 @@ def interactive_test():
         return
     
     print_status(f"Connected to agent: {agent_id}")
-    print_info("Type 'quit' to exit")
+    print_info("Type 'quit' to exit, '&<question>' to ask in the background, ':bg' to list background queries")
     print("")
     
+    bedrock_runtime = create_runtime_client()
     session_id = f"interactive-{int(time.time())}"
+    output_lock = threading.Lock()
+    background = ThreadPoolExecutor(max_workers=INTERACTIVE_MAX_BACKGROUND)
+    background_queries = []
+    
+    def run_background(number, question):
+        parts = []
+        try:
+            # Separate agent session so it doesn't interleave with the foreground conversation
+            timing = stream_turn(bedrock_runtime, agent_id, f"{session_id}-bg{number}", question, parts.append)
+            with output_lock:
+                print(f"\n[bg {number}] {question}\nAgent: {''.join(parts)}\n({format_timing(*timing)})\n")
+        except Exception as e:
+            with output_lock:
+                print_error(f"[bg {number}] {e}")
     
     while True:
         try:
@@ -180,24 +225,37 @@ def interactive_test():
             if not user_input:
                 continue
             
-            session = boto3.Session(profile_name=PROFILE, region_name=REGION)
-            bedrock_runtime = session.client('bedrock-agent-runtime')
+            if user_input == ':bg':
+                for number, question, future in background_queries:
+                    state = 'done' if future.done() else 'running'
+                    print(f"[bg {number}] {state}: {question}")
+                continue
             
-            response = bedrock_runtime.invoke_agent(
-                agentId=agent_id,
-                agentAliasId='TSTALIASID',
-                sessionId=session_id,
-                inputText=user_input
-            )
+            if user_input.startswith('&'):
+                question = user_input[1:].strip()
+                if question:
+                    number = len(background_queries) + 1
+                    future = background.submit(run_background, number, question)
+                    background_queries.append((number, question, future))
+                    print_info(f"Started background query {number}")
+                continue
             
-            print(f"Agent: {json.dumps(response, indent=2, default=str)}")
-            print("")
+            with output_lock:
+                print("Agent: ", end="", flush=True)
+                timing = stream_turn(
+                    bedrock_runtime, agent_id, session_id, user_input,
+                    lambda text: print(text, end="", flush=True)
+                )
+                print(f"\n({format_timing(*timing)})")
+                print("")
             
         except KeyboardInterrupt:
             print("\nGoodbye!")
             break
         except Exception as e:
             print_error(f"Error: {e}")
+    
+    background.shutdown(wait=False, cancel_futures=True)
 
 if __name__ == "__main__":
     import sys
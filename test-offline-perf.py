@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Offline performance regression suite for AWS Bedrock Support Bot
+Exercises the chat path against a local fake agent runtime and enforces latency,
+memory and throughput budgets - no AWS credentials or network needed
+"""
+
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from botocore.exceptions import ClientError
+
+import app
+import inventory
+from completion_reader import read_completion
+from scheduler import FairScheduler
+
+# Budgets - the suite fails when any of these is exceeded
+OVERHEAD_BUDGET_MS = 5.0  # Mean /chat time per request with an instant upstream
+OVERHEAD_P99_BUDGET_MS = 20.0
+STREAM_PEAK_BUDGET_BYTES = 1024 * 1024  # Peak memory while the app reads an endless answer
+BUFFERED_PEAK_FACTOR = 2.5  # Peak memory / payload size when reading a large answer in full
+THROUGHPUT_BUDGET_RPS = 200  # /chat requests per second at THROUGHPUT_CONCURRENCY
+THROUGHPUT_CONCURRENCY = 8
+THROUGHPUT_UPSTREAM_LATENCY = 0.02  # Seconds the fake agent takes per invocation
+CANCEL_TIMEOUT = 1.5  # Deadline sent with a request whose upstream stalls
+CANCEL_BUDGET_S = 2.5  # Time until that request is answered
+
+OVERHEAD_REQUESTS = 500
+THROUGHPUT_REQUESTS = 400
+MESSAGE = "Please explain how the quarterly invoice totals are calculated"  # Not a fast path intent
+
+def print_status(message):
+    print(f"✅ {message}")
+
+def print_error(message):
+    print(f"❌ {message}")
+
+def print_info(message):
+    print(f"ℹ️  {message}")
+
+def print_test(message):
+    print(f"🧪 {message}")
+
+class FakeEventStream:
+    """Lazily yields completion chunk events, like botocore's EventStream"""
+
+    def __init__(self, chunks, chunk_delay=0.0):
+        self.chunks = chunks
+        self.chunk_delay = chunk_delay
+        self.closed = False
+        self.events_read = 0
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            if self.closed:
+                raise ValueError("Event stream closed")
+            if self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            self.events_read += 1
+            yield {'chunk': {'bytes': chunk}}
+
+    def close(self):
+        self.closed = True
+
+class FakeConnection:
+    def __init__(self, sock):
+        self.sock = sock
+
+class FakeRawStream:
+    """urllib3 response whose reads block on a real socket the fake agent never writes to"""
+
+    def __init__(self):
+        self.sock, self.peer = socket.socketpair()
+        self._connection = FakeConnection(self.sock)
+        self.read_lock = threading.Lock()
+
+    def stream(self):
+        while True:
+            with self.read_lock:
+                data = self.sock.recv(4096)
+            if not data:
+                raise ConnectionError("Connection broken")
+            yield data
+
+    def close(self):
+        with self.read_lock:  # Like urllib3, waits for a read in progress
+            self.sock.close()
+            self.peer.close()
+
+class StalledEventStream:
+    """Event stream that stalls inside a read, like botocore's EventStream on a hung upstream"""
+
+    def __init__(self):
+        self._raw_stream = FakeRawStream()
+        self.events_read = 0
+
+    def __iter__(self):
+        for data in self._raw_stream.stream():
+            self.events_read += 1
+            yield {'chunk': {'bytes': data}}
+
+    def close(self):
+        self._raw_stream.close()
+
+class FakeAgentRuntime:
+    """Stands in for the bedrock-agent-runtime client"""
+
+    def __init__(self, chunks=None, latency=0.0, error_code=None, stall=False, error_times=None):
+        self.chunks = chunks or (lambda: [b"Invoices are ", b"totalled per ", b"billing period."])
+        self.latency = latency
+        self.error_code = error_code
+        self.error_times = error_times  # Fail this many calls with error_code, then succeed (None = always)
+        self.stall = stall
+        self.last_stream = None
+        self.calls = 0
+
+    def invoke_agent(self, **kwargs):
+        self.calls += 1
+        if self.error_code and (self.error_times is None or self.calls <= self.error_times):
+            raise ClientError({'Error': {'Code': self.error_code, 'Message': 'fake'}}, 'InvokeAgent')
+        if self.latency:
+            time.sleep(self.latency)
+        self.last_stream = StalledEventStream() if self.stall else FakeEventStream(self.chunks())
+        return {'completion': self.last_stream}
+
+class FakePaginator:
+    """Returns canned pages for one list operation"""
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    def paginate(self, **kwargs):
+        return iter(self.pages(**kwargs) if callable(self.pages) else self.pages)
+
+class FakeDiscoveryClient:
+    """Stands in for the bedrock-agent, lambda, iam and tagging clients during discovery"""
+
+    PAGES = {
+        'list_agents': [
+            {'agentSummaries': [{'agentName': 'unrelated-agent', 'agentId': 'OTHER', 'agentStatus': 'PREPARED'}]},
+            {'agentSummaries': [
+                {'agentName': f"{app.PROJECT_NAME}-agent", 'agentId': 'FAKEAGENT1', 'agentStatus': 'PREPARED'},
+                {'agentName': f"my-{app.PROJECT_NAME}-prod", 'agentId': 'OTHERTEAM', 'agentStatus': 'PREPARED'}
+            ]}
+        ],
+        'list_functions': [{'Functions': [
+            {'FunctionName': f"{app.PROJECT_NAME}-fallback-function", 'FunctionArn': 'arn:fallback'},
+            {'FunctionName': f"{app.PROJECT_NAME}-someone-elses", 'FunctionArn': 'arn:other'}
+        ]}],
+        'list_roles': [{'Roles': [
+            {'RoleName': f"{app.PROJECT_NAME}-agent-role"},
+            {'RoleName': f"{app.PROJECT_NAME}-tagged-role"},
+            {'RoleName': f"{app.PROJECT_NAME}-untagged-role"},
+            {'RoleName': 'unrelated-role'}
+        ]}],
+        'get_resources': [{'ResourceTagMappingList': []}]
+    }
+    ROLE_TAGS = {f"{app.PROJECT_NAME}-tagged-role": [{'Key': 'Project', 'Value': app.PROJECT_NAME}]}
+
+    def get_paginator(self, operation):
+        if operation == 'list_role_tags':
+            return FakePaginator(lambda RoleName: [{'Tags': self.ROLE_TAGS.get(RoleName, [])}])
+        return FakePaginator(self.PAGES[operation])
+
+class DeniedDiscoveryClient(FakeDiscoveryClient):
+    """Discovery client without permission to list agents"""
+
+    def get_paginator(self, operation):
+        if operation == 'list_agents':
+            raise ClientError({'Error': {'Code': 'AccessDeniedException', 'Message': 'fake'}}, 'ListAgents')
+        return super().get_paginator(operation)
+
+class FakeSession:
+    """Stands in for boto3.Session"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    discovery_client = FakeDiscoveryClient
+
+    def client(self, service_name, **kwargs):
+        return FakeAgentRuntime() if service_name == 'bedrock-agent-runtime' else self.discovery_client()
+
+class DeniedSession(FakeSession):
+    discovery_client = DeniedDiscoveryClient
+
+def use_runtime(runtime):
+    app.bedrock_runtime = runtime
+    app.deadline_runtime_clients = False
+    app.bedrock_agent_id = 'FAKEAGENT1'
+    # Budgets measure the chat path, not the per-client rate limit
+    app.scheduler = FairScheduler(app.MAX_CONCURRENT_INVOCATIONS, client_rate=1e9, client_burst=1e9)
+
+def generate_chunks(total_bytes, chunk_size=4096):
+    """Yield chunks without ever holding the whole payload"""
+    chunk = (b"0123456789abcdef" * (chunk_size // 16 + 1))[:chunk_size]
+    for _ in range(total_bytes // chunk_size):
+        yield chunk
+
+def check_agent_discovery():
+    """initialize_aws() finds the project's agent across paginated results"""
+    real_session, real_cache_file = inventory.boto3.Session, inventory.CACHE_FILE
+    inventory.boto3.Session = FakeSession
+    inventory.sessions.clear()
+    inventory.clients.clear()
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            inventory.CACHE_FILE = os.path.join(cache_dir, 'inventory.json')
+            app.bedrock_agent_id = None
+            found = app.initialize_aws()
+    finally:
+        inventory.boto3.Session, inventory.CACHE_FILE = real_session, real_cache_file
+        inventory.sessions.clear()
+        inventory.clients.clear()
+    return found and app.bedrock_agent_id == 'FAKEAGENT1', f"agent_id={app.bedrock_agent_id}"
+
+def check_ownership_filter():
+    """Only the deployment's own names or the Project tag mark resources for cleanup, and failed lookups surface"""
+    real_session, real_cache_file = inventory.boto3.Session, inventory.CACHE_FILE
+    inventory.boto3.Session = FakeSession
+    inventory.sessions.clear()
+    inventory.clients.clear()
+    try:
+        found = inventory.scan(['us-east-1'], None, include_global=False)
+        roles = inventory.list_roles(None)
+        inventory.boto3.Session = DeniedSession
+        inventory.sessions.clear()
+        inventory.clients.clear()
+        with tempfile.TemporaryDirectory() as cache_dir:
+            inventory.CACHE_FILE = os.path.join(cache_dir, 'inventory.json')
+            try:
+                inventory.find_agent('us-east-1', max_age=0)
+                denied = 'no error'
+            except inventory.DiscoveryError as e:
+                denied = 'AccessDeniedException' in str(e)
+    finally:
+        inventory.boto3.Session, inventory.CACHE_FILE = real_session, real_cache_file
+        inventory.sessions.clear()
+        inventory.clients.clear()
+    agents = [agent['id'] for agent in found['regions']['us-east-1']['agents']]
+    functions = [function['name'] for function in found['regions']['us-east-1']['functions']]
+    expected_roles = [f"{app.PROJECT_NAME}-agent-role", f"{app.PROJECT_NAME}-tagged-role"]
+    ok = (agents == ['FAKEAGENT1'] and roles == expected_roles
+          and functions == [f"{app.PROJECT_NAME}-fallback-function"] and denied is True)
+    return ok, f"agents={agents}, roles={roles}, functions={functions}, denied lookup raised={denied}"
+
+def check_chat_responses():
+    """/chat validates input, answers from the fast path and assembles agent output"""
+    use_runtime(FakeAgentRuntime())
+    client = app.app.test_client()
+    cases = [
+        (client.post('/chat', json={}), 400, None),
+        (client.post('/chat', json={'message': '   '}), 400, None),
+        (client.post('/chat', json={'message': 'x' * 501}), 400, None),
+        (client.post('/chat', json={'message': 'How do I reset my password?'}), 200, 'password_reset'),
+        (client.post('/chat', json={'message': MESSAGE}), 200, 'Invoices are totalled per billing period.')
+    ]
+    for response, status, expected in cases:
+        if response.status_code != status:
+            return False, f"expected {status}, got {response.status_code}: {response.get_json()}"
+        body = response.get_json()
+        if expected and expected not in (body.get('intent'), body.get('response')):
+            return False, f"unexpected body: {body}"
+    return True, f"{len(cases)} requests"
+
+def check_error_mapping():
+    """Agent errors become friendly messages instead of server errors"""
+    expected = {
+        'ResourceNotFoundException': "The agent is not available right now. Please try again later.",
+        'AccessDeniedException': "I don't have permission to access the agent. Please check the configuration.",
+        'ThrottlingException': "I encountered an error: ThrottlingException. Please try again."
+    }
+    for error_code, message in expected.items():
+        use_runtime(FakeAgentRuntime(error_code=error_code))
+        result = app.call_bedrock_agent(MESSAGE)
+        if result != message:
+            return False, f"{error_code} -> {result!r}"
+
+    # Transient errors are retried while the deadline leaves room, then surfaced
+    runtime = FakeAgentRuntime(error_code='ThrottlingException', error_times=2)
+    use_runtime(runtime)
+    result = app.call_bedrock_agent(MESSAGE, deadline=time.monotonic() + 30)
+    if result != 'Invoices are totalled per billing period.' or runtime.calls != 3:
+        return False, f"retry within deadline -> {result!r} after {runtime.calls} calls"
+    runtime = FakeAgentRuntime(error_code='ThrottlingException')
+    use_runtime(runtime)
+    result = app.call_bedrock_agent(MESSAGE, deadline=time.monotonic() + 1.2)
+    if result != expected['ThrottlingException'] or runtime.calls > 2:
+        return False, f"retry past deadline -> {result!r} after {runtime.calls} calls"
+    return True, f"{len(expected)} error codes, throttling retried within the deadline"
+
+def check_request_overhead():
+    """Per-request /chat overhead with an instant upstream"""
+    use_runtime(FakeAgentRuntime())
+    client = app.app.test_client()
+    for _ in range(20):  # Warm up
+        client.post('/chat', json={'message': MESSAGE})
+
+    timings = []
+    for _ in range(OVERHEAD_REQUESTS):
+        start = time.perf_counter()
+        response = client.post('/chat', json={'message': MESSAGE})
+        timings.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            return False, f"status {response.status_code}"
+
+    timings.sort()
+    mean_ms = sum(timings) / len(timings) * 1000
+    p99_ms = timings[int(len(timings) * 0.99) - 1] * 1000
+    detail = f"mean {mean_ms:.2f}ms (budget {OVERHEAD_BUDGET_MS}ms), p99 {p99_ms:.2f}ms (budget {OVERHEAD_P99_BUDGET_MS}ms)"
+    return mean_ms <= OVERHEAD_BUDGET_MS and p99_ms <= OVERHEAD_P99_BUDGET_MS, detail
+
+def check_streamed_memory():
+    """An endless answer is cut off at MAX_RESPONSE_BYTES without buffering the rest"""
+    runtime = FakeAgentRuntime(chunks=lambda: generate_chunks(256 * 1024 * 1024))
+    use_runtime(runtime)
+    tracemalloc.start()
+    try:
+        result = app.call_bedrock_agent(MESSAGE)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    events = runtime.last_stream.events_read
+    ok = peak <= STREAM_PEAK_BUDGET_BYTES and runtime.last_stream.closed and len(result) <= app.MAX_RESPONSE_BYTES + 100
+    return ok, f"peak {peak / 1024:.0f}KB (budget {STREAM_PEAK_BUDGET_BYTES / 1024:.0f}KB), {events} events read, stream closed={runtime.last_stream.closed}"
+
+def check_buffered_memory():
+    """Reading a large answer in full stays within a constant factor of its size"""
+    payload_bytes = 8 * 1024 * 1024
+    tracemalloc.start()
+    try:
+        reader = read_completion(FakeEventStream(generate_chunks(payload_bytes)), max_bytes=payload_bytes)
+        text = reader.text()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    budget = payload_bytes * BUFFERED_PEAK_FACTOR
+    ok = len(text) == payload_bytes and not reader.truncated and peak <= budget
+    return ok, f"peak {peak / 1024 / 1024:.1f}MB for {payload_bytes / 1024 / 1024:.0f}MB (budget {budget / 1024 / 1024:.1f}MB)"
+
+def check_stalled_upstream():
+    """A read stalled past the deadline is aborted promptly, and a finished read is never cancelled"""
+    use_runtime(FakeAgentRuntime(stall=True))
+    client = app.app.test_client()
+    start = time.perf_counter()
+    response = client.post('/chat', json={'message': MESSAGE}, headers={'X-Request-Timeout': str(CANCEL_TIMEOUT)})
+    elapsed = time.perf_counter() - start
+    detail = f"status {response.status_code} after {elapsed:.2f}s (budget {CANCEL_BUDGET_S}s)"
+    if response.status_code != 504 or elapsed > CANCEL_BUDGET_S:
+        return False, detail
+
+    watchdog = app.InvocationWatchdog(FakeEventStream([]), deadline=time.monotonic())
+    watchdog.finish()
+    watchdog.cancel('deadline')
+    if watchdog.reason is not None:
+        return False, f"finished read cancelled ({watchdog.reason}); {detail}"
+    return True, detail
+
+def check_client_identity():
+    """Identity and lane come from configuration, and idle clients are forgotten"""
+    app.api_keys = {'batch-key': {'client': 'crm-sync', 'lane': 'batch'},
+                    'replay-key': {'client': 'replay', 'replay': True}}
+    spoofed = {'X-Client-Id': 'someone-else', 'X-Client-Lane': 'interactive'}
+    cases = [
+        ('203.0.113.7', spoofed, ('203.0.113.7', 'batch')),
+        ('127.0.0.1', {}, ('127.0.0.1', 'interactive')),
+        ('203.0.113.7', {'X-Api-Key': 'batch-key', **spoofed}, ('crm-sync', 'batch')),
+        ('203.0.113.7', {'X-Api-Key': 'replay-key', 'X-Replay-Client': 'abc', 'X-Replay-Lane': 'interactive'},
+         ('replay:abc', 'interactive')),
+        ('203.0.113.7', {'X-Api-Key': 'wrong'}, (None, None))
+    ]
+    try:
+        for address, headers, expected in cases:
+            with app.app.test_request_context('/chat', headers=headers, environ_base={'REMOTE_ADDR': address}):
+                if app.request_client() != expected:
+                    return False, f"{address} {headers} -> {app.request_client()}, expected {expected}"
+        use_runtime(FakeAgentRuntime())
+        response = app.app.test_client().post('/chat', json={'message': MESSAGE}, headers={'X-Api-Key': 'wrong'})
+        if response.status_code != 401:
+            return False, f"unknown API key got {response.status_code}"
+    finally:
+        app.api_keys = None
+
+    scheduler = FairScheduler(1, client_rate=1000, client_burst=1)
+    for client_id in range(1000):
+        with scheduler.slot(f"client-{client_id}", 'batch'):
+            pass
+    time.sleep(scheduler.idle_after * 2)
+    scheduler.take_token('client-last', 'batch')
+    tracked = scheduler.stats()['tracked_clients']
+    return tracked == 1, f"{len(cases)} identities, {tracked} of 1001 clients tracked after idling"
+
+def check_throughput():
+    """/chat throughput at fixed concurrency with a fixed upstream latency"""
+    use_runtime(FakeAgentRuntime(latency=THROUGHPUT_UPSTREAM_LATENCY))
+    per_thread = THROUGHPUT_REQUESTS // THROUGHPUT_CONCURRENCY
+    failures = []
+
+    def worker():
+        client = app.app.test_client()
+        for _ in range(per_thread):
+            response = client.post('/chat', json={'message': MESSAGE})
+            if response.status_code != 200:
+                failures.append(response.status_code)
+
+    threads = [threading.Thread(target=worker) for _ in range(THROUGHPUT_CONCURRENCY)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    rps = per_thread * THROUGHPUT_CONCURRENCY / elapsed
+    ideal = THROUGHPUT_CONCURRENCY / THROUGHPUT_UPSTREAM_LATENCY
+    detail = f"{rps:.0f} req/s at concurrency {THROUGHPUT_CONCURRENCY} (budget {THROUGHPUT_BUDGET_RPS}, ideal {ideal:.0f})"
+    if failures:
+        return False, f"{len(failures)} failed requests; {detail}"
+    return rps >= THROUGHPUT_BUDGET_RPS, detail
+
+CHECKS = [
+    ("Agent discovery", check_agent_discovery),
+    ("Resource ownership", check_ownership_filter),
+    ("Chat responses", check_chat_responses),
+    ("Error mapping", check_error_mapping),
+    ("Per-request overhead", check_request_overhead),
+    ("Streamed response memory", check_streamed_memory),
+    ("Buffered response memory", check_buffered_memory),
+    ("Stalled upstream cancellation", check_stalled_upstream),
+    ("Client identity", check_client_identity),
+    ("Throughput", check_throughput)
+]
+
+def main():
+    """Run every check and exit non-zero if any fails or exceeds its budget"""
+    print("🤖 Offline performance regression suite")
+    print("=" * 50)
+
+    failed = 0
+    for name, check in CHECKS:
+        print_test(name)
+        try:
+            ok, detail = check()
+        except Exception as e:
+            ok, detail = False, f"raised {type(e).__name__}: {e}"
+        if ok:
+            print_status(detail)
+        else:
+            print_error(detail)
+            failed += 1
+
+    print("")
+    print("=" * 50)
+    if failed:
+        print_error(f"{failed}/{len(CHECKS)} checks failed")
+        return 1
+    print_status(f"All {len(CHECKS)} checks passed")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())